@@ -26,10 +26,12 @@ echo.
 echo Starting NUITKA build...
 echo.
 
+REM Keep Nuitka's compilation cache between builds
+if not defined NUITKA_CACHE_DIR set "NUITKA_CACHE_DIR=%~dp0.nuitka-cache"
+
 REM Build with NUITKA
 python -m nuitka ^
     --standalone ^
-    --onefile ^
     --windows-icon-from-ico=src\icon.ico ^
     --output-dir="build 1.0.0" ^
     --output-filename=TextEditorPlus.exe ^
@@ -42,7 +44,19 @@ python -m nuitka ^
     --assume-yes-for-downloads ^
     --show-progress ^
     --show-memory ^
-    --remove-output ^
+    --lto=yes ^
+    --jobs=%NUMBER_OF_PROCESSORS% ^
+    --python-flag=no_asserts ^
+    --python-flag=no_docstrings ^
+    --nofollow-import-to=tkinter ^
+    --nofollow-import-to=unittest ^
+    --nofollow-import-to=test ^
+    --nofollow-import-to=pydoc ^
+    --nofollow-import-to=doctest ^
+    --nofollow-import-to=xmlrpc ^
+    --nofollow-import-to=email ^
+    --nofollow-import-to=http ^
+    --msvc=latest ^
     main.py
 
 if errorlevel 1 (
@@ -55,7 +69,8 @@ if errorlevel 1 (
 echo.
 echo ========================================
 echo Build completed successfully!
-echo Output: build 1.0.0\TextEditorPlus.exe
+echo Output: build 1.0.0\main.dist\TextEditorPlus.exe
+echo Package the whole main.dist folder (e.g. with inno.iss)
 echo ========================================
 echo.
 pause
@@ -7,9 +7,15 @@ This script creates a standalone .exe file in current folder
 
 import os
 import sys
+import shutil
 import subprocess
+import importlib.util
 from pathlib import Path
 
+# Optional backends imported by name at runtime (see optional_import in
+# src/utils.py); Nuitka can't follow those imports, so they are listed here
+OPTIONAL_BACKENDS = ("lxml", "orjson", "black", "jsbeautifier")
+
 def check_nuitka():
     """Check if NUITKA is installed"""
     try:
@@ -58,7 +64,6 @@ def build_exe():
     cmd = [
         sys.executable, "-m", "nuitka",
         "--standalone",
-        "--onefile",
         f"--output-dir={build_dir}",
         "--output-filename=TextEditorPlus.exe",
         "--include-package-data=src",
@@ -70,20 +75,56 @@ def build_exe():
         "--assume-yes-for-downloads",
         "--show-progress",
         "--show-memory",
-        "--remove-output",
+        "--lto=yes",
+        f"--jobs={os.cpu_count() or 4}",
+        "--python-flag=no_asserts",
+        "--python-flag=no_docstrings",
+        # Stdlib packages the editor never imports
+        "--nofollow-import-to=tkinter",
+        "--nofollow-import-to=unittest",
+        "--nofollow-import-to=test",
+        "--nofollow-import-to=pydoc",
+        "--nofollow-import-to=doctest",
+        "--nofollow-import-to=xmlrpc",
+        "--nofollow-import-to=email",
+        "--nofollow-import-to=http",
         "main.py"
     ]
     
+    if sys.platform == 'win32':
+        # Newest MSVC has the best optimizer for the generated C code
+        cmd.insert(-1, "--msvc=latest")
+    elif sys.platform.startswith('linux') and shutil.which('clang'):
+        # clang works well with ccache for the C compilation step
+        # (only if installed; Nuitka aborts when --clang can't find it)
+        cmd.insert(-1, "--clang")
+    
+    # Bundle the optional backends that are installed in this environment
+    for name in OPTIONAL_BACKENDS:
+        spec = importlib.util.find_spec(name)
+        if spec is None:
+            continue
+        if spec.submodule_search_locations is not None:
+            cmd.insert(-1, f"--include-package={name}")
+        else:
+            cmd.insert(-1, f"--include-module={name}")
+    
     if icon_option:
-        # Insert icon option after --onefile
+        # Insert icon option after the nuitka module arguments
         cmd.insert(3, icon_option)
     
+    # Keep Nuitka's compilation cache next to this script so rebuilds of
+    # unchanged modules are fast (the .build folder is kept for the same reason)
+    os.environ.setdefault("NUITKA_CACHE_DIR", str(script_dir / ".nuitka-cache"))
+    
     try:
         subprocess.check_call(cmd)
         print()
         print("=" * 50)
         print("Build completed successfully!")
-        print(f"Output: {build_dir / 'TextEditorPlus.exe'}")
+        # Standalone folder build: no per-launch unpacking like --onefile
+        print(f"Output: {build_dir / 'main.dist' / 'TextEditorPlus.exe'}")
+        print("Package the whole main.dist folder (e.g. with inno.iss)")
         print("=" * 50)
         return True
     except subprocess.CalledProcessError as e:
@@ -92,7 +133,63 @@ def build_exe():
         print(f"Error: {e}")
         return False
 
+# Source modules that can be compiled (CLI flag -> module path)
+EXTENSION_MODULES = {
+    "--formatters-module": "src/formatters.py",
+    "--highlighter-module": "src/syntax_highlighter.py",
+}
+
+# Folder the compiled modules are written to. They are only used when the
+# SMARTPAD_EXTENSIONS environment variable points here (see src/__init__.py),
+# so editing a .py file is never silently shadowed by an old compiled copy
+EXTENSION_DIR = "extensions"
+
+def build_extension_module(source):
+    """Compile a source module into a C extension module using NUITKA
+    
+    The extension (.pyd/.so) goes to EXTENSION_DIR next to this script, not
+    next to the .py file. Running from source with SMARTPAD_EXTENSIONS set
+    to that folder gets the compiled hot loops (formatting, per-block
+    highlighting) as well. The standalone build already compiles every module.
+    """
+    print("=" * 50)
+    print(f"Compiling {source} with NUITKA")
+    print("=" * 50)
+    print()
+    
+    script_dir = Path(__file__).parent.absolute()
+    project_root = script_dir.parent
+    os.chdir(project_root)
+    extension_dir = script_dir / EXTENSION_DIR
+    
+    if not check_nuitka():
+        return False
+    
+    cmd = [
+        sys.executable, "-m", "nuitka",
+        "--module",
+        f"--output-dir={extension_dir}",
+        "--remove-output",
+        source
+    ]
+    
+    try:
+        subprocess.check_call(cmd)
+        print()
+        print(f"{source} compiled successfully!")
+        print(f"Run with SMARTPAD_EXTENSIONS={extension_dir} to use it;")
+        print("delete that folder (or unset the variable) to go back to the .py files")
+        return True
+    except subprocess.CalledProcessError as e:
+        print()
+        print(f"{source} build failed!")
+        print(f"Error: {e}")
+        return False
+
 if __name__ == "__main__":
+    modules = [EXTENSION_MODULES[arg] for arg in sys.argv[1:] if arg in EXTENSION_MODULES]
+    if modules:
+        success = all(build_extension_module(source) for source in modules)
+        sys.exit(0 if success else 1)
     success = build_exe()
     sys.exit(0 if success else 1)
-
@@ -4,3 +4,36 @@ SmartPad - A smart text editor inspired by Notepad
 
 __version__ = "1.0.0"
 
+import os
+import warnings
+
+# Optional folder of compiled modules ("build 1.0.0/build_exe.py
+# --formatters-module --highlighter-module"), searched before the .py files
+# when set. It is ignored if a module was edited after it was compiled
+_extensions = os.environ.get('SMARTPAD_EXTENSIONS')
+
+
+def _stale_extensions(folder):
+    """Names of compiled modules in folder that are older than their source"""
+    stale = []
+    source_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in os.listdir(folder):
+        if not name.endswith(('.so', '.pyd')):
+            continue
+        source = os.path.join(source_dir, name.split('.')[0] + '.py')
+        if (os.path.exists(source)
+                and os.path.getmtime(source) > os.path.getmtime(os.path.join(folder, name))):
+            stale.append(name.split('.')[0])
+    return stale
+
+
+if _extensions and os.path.isdir(_extensions):
+    _stale = _stale_extensions(_extensions)
+    if _stale:
+        warnings.warn(
+            f"Ignoring compiled modules in {_extensions}: {', '.join(_stale)} "
+            "changed since they were built; rebuild them or delete the folder"
+        )
+    else:
+        __path__.insert(0, os.path.abspath(_extensions))
+
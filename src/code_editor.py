@@ -5,9 +5,15 @@ Code Editor Module
 Provides enhanced code editor with line numbers
 """
 
+from collections import OrderedDict
+
 from PyQt5.QtWidgets import QWidget, QPlainTextEdit
 from PyQt5.QtCore import Qt, QSize, QRect
-from PyQt5.QtGui import QFont, QColor, QPainter, QFontMetrics
+from PyQt5.QtGui import (QFont, QColor, QPainter, QFontMetrics,
+                         QStaticText, QTransform)
+
+# Maximum number of prepared line number labels kept in memory
+LINE_NUMBER_CACHE_SIZE = 8192
 
 
 class LineNumberArea(QWidget):
@@ -29,6 +35,16 @@ class CodeEditor(QPlainTextEdit):
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        # Cached line number area width and the key it was computed for
+        self._lnaw_cache = None
+        self._lnaw_key = None
+        # Width last applied as the viewport margin
+        self._lnaw_applied = None
+        # LRU cache of prepared line number labels (line number -> QStaticText)
+        self._num_cache = OrderedDict()
+        # DPI-scaled padding, refreshed when the window moves to another screen
+        self._screen_connected = False
+        self._update_dpi_padding()
         self.line_number_area = LineNumberArea(self)
         self.blockCountChanged.connect(self.update_line_number_area_width)
         self.updateRequest.connect(self.update_line_number_area)
@@ -44,36 +60,80 @@ class CodeEditor(QPlainTextEdit):
         tab_width = metrics.width(' ') * 4  # 4 spaces per tab
         self.setTabStopWidth(tab_width)
         
+        # Line number area colors, built once instead of on every paint
+        self._bg_dark = QColor(0x25, 0x25, 0x26)
+        self._bg_light = QColor(0xf8, 0xf8, 0xf8)
+        self._fg_line = QColor(0x85, 0x85, 0x85)
+        
         self.current_theme = 'dark'  # Default theme
     
     def set_theme(self, theme):
         """Set theme for line number area"""
         self.current_theme = theme
+        self._num_cache.clear()
         self.line_number_area.update()
     
-    def line_number_area_width(self):
-        """Calculate line number area width that scales with DPI"""
-        digits = 1
-        max_num = max(1, self.blockCount())
-        while max_num >= 10:
-            max_num /= 10
-            digits += 1
-        
-        # Use font metrics for proper scaling
-        metrics = self.fontMetrics()
-        char_width = metrics.width('9')
-        # Add padding that scales with DPI (minimum 10 logical pixels)
+    def setFont(self, font):
+        """Set editor font and invalidate cached line number metrics"""
+        super().setFont(font)
+        self._lnaw_key = None
+        self._num_cache.clear()
+        self.update_line_number_area_width(0)
+    
+    def _update_dpi_padding(self):
+        """Recompute line number padding for the current device pixel ratio"""
         # Use devicePixelRatioF() if available, otherwise use 1.0
         try:
             dpi_ratio = self.devicePixelRatioF()
         except:
             dpi_ratio = 1.0
-        padding = max(10, int(10 * dpi_ratio))
-        space = padding + char_width * digits
+        # Padding scales with DPI (minimum 10 logical pixels)
+        self._padding = max(10, int(10 * dpi_ratio))
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        # The window handle only exists once the widget is shown
+        if not self._screen_connected:
+            handle = self.window().windowHandle()
+            if handle:
+                handle.screenChanged.connect(self.on_screen_changed)
+                self._screen_connected = True
+            self.on_screen_changed(None)
+    
+    def on_screen_changed(self, _):
+        """Refresh DPI-dependent metrics after a screen change"""
+        self._update_dpi_padding()
+        self._lnaw_key = None
+        self._num_cache.clear()
+        self.update_line_number_area_width(0)
+    
+    def line_number_area_width(self):
+        """Calculate line number area width that scales with DPI"""
+        digits = len(str(max(1, self.blockCount())))
+        # The key leaves out the device pixel ratio (and with it the padding):
+        # on_screen_changed must reset _lnaw_key after a DPI change
+        key = (digits, self.font().pointSize())
+        if key == self._lnaw_key:
+            return self._lnaw_cache
+        
+        # Use font metrics for proper scaling
+        char_width = self.fontMetrics().width('9')
+        space = self._padding + char_width * digits
+        self._lnaw_key = key
+        self._lnaw_cache = space
         return space
     
     def update_line_number_area_width(self, _):
-        self.setViewportMargins(self.line_number_area_width(), 0, 0, 0)
+        width = self.line_number_area_width()
+        if width == self._lnaw_applied:
+            return  # Same digit count: no relayout (this runs on every new line)
+        self._lnaw_applied = width
+        self.setViewportMargins(width, 0, 0, 0)
+        # Resize the area here too, so a new digit doesn't wait for resizeEvent
+        cr = self.contentsRect()
+        self.line_number_area.setGeometry(
+            QRect(cr.left(), cr.top(), width, cr.height())
+        )
     
     def update_line_number_area(self, rect, dy):
         if dy:
@@ -81,8 +141,6 @@ class CodeEditor(QPlainTextEdit):
         else:
             self.line_number_area.update(0, rect.y(), 
                                         self.line_number_area.width(), rect.height())
-        if rect.contains(self.viewport().rect()):
-            self.update_line_number_area_width(0)
     
     def resizeEvent(self, event):
         super().resizeEvent(event)
@@ -95,31 +153,43 @@ class CodeEditor(QPlainTextEdit):
         painter = QPainter(self.line_number_area)
         # Use theme from CodeEditor
         if self.current_theme == 'light':
-            painter.fillRect(event.rect(), QColor("#f8f8f8"))
-            text_color = QColor("#858585")
+            painter.fillRect(event.rect(), self._bg_light)
         else:
-            painter.fillRect(event.rect(), QColor("#252526"))
-            text_color = QColor("#858585")
+            painter.fillRect(event.rect(), self._bg_dark)
+        
+        painter.setPen(self._fg_line)
+        painter.setFont(self.font())
         
+        width = self.line_number_area.width()
+        rect_top = event.rect().top()
+        rect_bottom = event.rect().bottom()
         block = self.firstVisibleBlock()
         block_number = block.blockNumber()
-        top = self.blockBoundingGeometry(block).translated(
-            self.contentOffset()).top()
-        bottom = top + self.blockBoundingRect(block).height()
+        top = int(self.blockBoundingGeometry(block).translated(
+            self.contentOffset()).top())
         
-        while block.isValid() and top <= event.rect().bottom():
-            if block.isVisible() and bottom >= event.rect().top():
-                number = str(block_number + 1)
-                painter.setPen(text_color)
-                rect = QRect(
-                    0, int(top), 
-                    self.line_number_area.width(), 
-                    self.fontMetrics().height()
-                )
-                painter.drawText(rect, Qt.AlignRight, number)
+        while block.isValid() and top <= rect_bottom:
+            bottom = top + int(self.blockBoundingRect(block).height())
+            if block.isVisible() and bottom >= rect_top:
+                static_text = self._line_number_text(block_number + 1)
+                x = width - static_text.size().width()
+                painter.drawStaticText(int(x), top, static_text)
             
             block = block.next()
             top = bottom
-            bottom = top + self.blockBoundingRect(block).height()
             block_number += 1
-
+    
+    def _line_number_text(self, number):
+        """Get a prepared QStaticText for a line number from the LRU cache"""
+        static_text = self._num_cache.get(number)
+        if static_text is not None:
+            self._num_cache.move_to_end(number)
+            return static_text
+        
+        static_text = QStaticText(str(number))
+        static_text.setTextFormat(Qt.PlainText)
+        static_text.prepare(QTransform(), self.font())
+        self._num_cache[number] = static_text
+        if len(self._num_cache) > LINE_NUMBER_CACHE_SIZE:
+            self._num_cache.popitem(last=False)
+        return static_text
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Format Worker Module
+Runs code formatters on a background thread
+"""
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+from .formatters import Formatters
+
+# Formatter for each supported language
+FORMATTERS = {
+    'xml': Formatters.format_xml,
+    'html': Formatters.format_xml,
+    'json': Formatters.format_json,
+    'python': Formatters.format_python,
+    'css': Formatters.format_css,
+    'javascript': Formatters.format_javascript,
+}
+
+
+class FormatWorkerSignals(QObject):
+    """Signals emitted by FormatWorker (QRunnable cannot emit signals itself)"""
+    
+    # (language, formatted, error) - language is None if auto-detection failed
+    finished = pyqtSignal(object, object, object)
+
+
+class FormatWorker(QRunnable):
+    """Background job that formats content for a given language"""
+    
+    def __init__(self, language, content):
+        super().__init__()
+        self.language = language
+        self.content = content
+        self.signals = FormatWorkerSignals()
+    
+    def run(self):
+        """Format content and report the result through signals.finished"""
+        formatter = FORMATTERS.get(self.language)
+        if formatter is None:
+            # Unsupported language (auto_format resolves unknown types first)
+            self.signals.finished.emit(None, None, None)
+            return
+        
+        formatted, error = formatter(self.content)
+        self.signals.finished.emit(self.language, formatted, error)
@@ -6,38 +6,104 @@ Provides code formatting functions for various file types
 """
 
 import json
-import xml.dom.minidom
 import re
+import functools
+
+from .utils import optional_import
+
+
+# First non-whitespace character (emptiness check without copying content)
+_NONSPACE = re.compile(r'\S')
+# Leading XML declaration, e.g. <?xml version="1.0" encoding="UTF-8"?>
+_XML_DECL = re.compile(r'\s*(<\?xml.*?\?>)', re.DOTALL)
+
+# Pre-compiled patterns for the CSS formatter
+_CSS_OPEN = re.compile(r'\s*\{\s*')
+_CSS_CLOSE = re.compile(r'\s*\}\s*')
+_CSS_SEMI = re.compile(r'\s*;\s*')
+
+# Numbers orjson would print differently from json, so leave those to json:
+# integers wider than 64 bits (parsed as floats) and anything with a fraction
+# or exponent (orjson writes 1.5e-05 as 0.000015 and 1e+100 as 1e100).
+# A digit followed by . or e inside a string also counts; that only costs speed
+_JSON_ORJSON_UNSAFE = re.compile(r'\d{16}|\d[.eE]')
+
+# Line prefixes/suffixes that drive indentation in the basic formatters
+_PY_DEDENT = ('elif ', 'else:', 'except', 'finally:')
+_PY_DEDENT_NEXT = ('return ', 'break', 'continue', 'pass', 'raise ')
+_JS_DEDENT = ('}', ']')
+_JS_INDENT_SUFFIX = ('{', '[')
+
+# Line kinds in the minidom XML output (see _format_xml_minidom)
+_LINE_TEXT, _LINE_OPENING, _LINE_CLOSING, _LINE_COMMENT = range(4)
+
+
+# Formatting is deterministic, so the last result is cached per formatter,
+# keyed on the full content. Each entry holds a whole document and its
+# formatted copy, so only one is kept; re-formatting an unchanged buffer is
+# mostly caught earlier by TextEditor.formatted_state
+FORMAT_CACHE_SIZE = 1
 
 
 class Formatters:
     """Code formatters for various file types"""
     
     @staticmethod
+    @functools.lru_cache(maxsize=FORMAT_CACHE_SIZE)
     def format_xml(content):
         """Format XML content with professional standard formatting"""
         try:
-            if not content.strip():
+            if not _NONSPACE.search(content):
                 return None, "No content to format"
             
+            etree = optional_import('lxml.etree')
+            if etree is None:
+                return Formatters._format_xml_minidom(content)
+            
+            # Parse and pretty-print in libxml2; the encoding override makes
+            # the parser ignore whatever the declaration claims. Entities are
+            # kept as references (never fetched or inlined into the buffer),
+            # and huge_tree lifts the depth/text size limits minidom doesn't have
+            parser = etree.XMLParser(
+                remove_blank_text=True, encoding='utf-8',
+                resolve_entities=False, no_network=True, huge_tree=True
+            )
+            root = etree.fromstring(content.encode('utf-8'), parser)
+            formatted = etree.tostring(
+                root.getroottree(), pretty_print=True, encoding='unicode'
+            ).rstrip('\n')
+            
+            # Preserve original XML declaration (lxml drops it for str output)
+            decl_match = _XML_DECL.match(content)
+            if decl_match:
+                formatted = decl_match.group(1) + '\n' + formatted
+            
+            return formatted, None
+        except Exception as e:
+            return None, str(e)
+    
+    @staticmethod
+    def _format_xml_minidom(content):
+        """Format XML content with minidom (used when lxml is unavailable)"""
+        try:
+            # Imported lazily: minidom pulls in xml.dom and expat at startup
+            import xml.dom.minidom
+            
             # Parse and format XML using minidom
             dom = xml.dom.minidom.parseString(content)
             # Use 2 spaces for indentation (standard)
             formatted = dom.toprettyxml(indent="  ")
             
             # Clean up and improve formatting
-            lines = formatted.split('\n')
-            cleaned_lines = []
-            
-            # Remove empty lines from minidom output and clean up
-            for line in lines:
-                stripped = line.rstrip()
-                if stripped:  # Keep non-empty lines
-                    cleaned_lines.append(stripped)
+            # Remove empty lines from minidom output (rstrip each line once)
+            cleaned_lines = [
+                stripped for stripped in (line.rstrip() for line in formatted.split('\n'))
+                if stripped
+            ]
             
             # Professional formatting: organize with proper spacing
             result_lines = []
-            prev_line = None
+            prev_kind = None
             prev_indent = -1
             
             for i, line in enumerate(cleaned_lines):
@@ -48,39 +114,44 @@ class Formatters:
                         result_lines.append('')  # Add blank line after declaration
                     continue
                 
-                # Calculate current indent level
-                indent = len(line) - len(line.lstrip())
-                stripped = line.strip()
+                # Calculate current indent level (lines are already rstripped)
+                stripped = line.lstrip()
+                indent = len(line) - len(stripped)
                 
-                # Detect line type
-                is_closing = stripped.startswith('</')
-                is_opening = stripped.startswith('<') and not is_closing and not stripped.startswith('<!--')
-                is_comment = stripped.startswith('<!--')
+                # Detect line type from its first characters
+                head = stripped[:2]
+                if head == '</':
+                    kind = _LINE_CLOSING
+                elif head[:1] != '<':
+                    kind = _LINE_TEXT
+                elif head == '<!' and stripped.startswith('<!--'):
+                    kind = _LINE_COMMENT
+                else:
+                    kind = _LINE_OPENING
                 
-                # Add blank line before major elements at root or same level
-                if prev_line and not is_comment:
-                    # Add blank line when:
-                    # 1. Previous was closing tag and current is opening at same/higher level
-                    # 2. Both are opening tags at same level (sibling elements)
-                    if is_opening:
-                        if prev_line.strip().startswith('</'):
-                            # Previous was closing, add blank line before new element
-                            if indent <= prev_indent:
-                                result_lines.append('')
-                        elif prev_line.strip().startswith('<') and not prev_line.strip().startswith('<!--'):
-                            # Previous was opening tag, add blank line if at same level
-                            if indent == prev_indent and indent > 0:
-                                result_lines.append('')
+                # Add blank line before major elements at root or same level:
+                # 1. Previous was closing tag and current is opening at same/higher level
+                # 2. Both are opening tags at same level (sibling elements)
+                if kind == _LINE_OPENING:
+                    if prev_kind == _LINE_CLOSING:
+                        # Previous was closing, add blank line before new element
+                        if indent <= prev_indent:
+                            result_lines.append('')
+                    elif prev_kind == _LINE_OPENING:
+                        # Previous was opening tag, add blank line if at same level
+                        if indent == prev_indent and indent > 0:
+                            result_lines.append('')
                 
                 result_lines.append(line)
-                prev_line = line
+                prev_kind = kind
                 prev_indent = indent
             
             formatted = '\n'.join(result_lines)
             
             # Preserve original XML declaration encoding
-            if content.strip().startswith('<?xml'):
-                original_decl = content.strip().split('\n')[0]
+            decl_match = _XML_DECL.match(content)
+            if decl_match:
+                original_decl = decl_match.group(1)
                 if formatted.startswith('<?xml'):
                     # Replace declaration with original to preserve encoding
                     formatted_lines = formatted.split('\n')
@@ -92,12 +163,24 @@ class Formatters:
             return None, str(e)
     
     @staticmethod
+    @functools.lru_cache(maxsize=FORMAT_CACHE_SIZE)
     def format_json(content):
         """Format JSON content"""
         try:
-            if not content.strip():
+            if not _NONSPACE.search(content):
                 return None, "No content to format"
             
+            # Fast path: parse and serialize in a single native pass
+            orjson = optional_import('orjson')
+            if orjson is not None and not _JSON_ORJSON_UNSAFE.search(content):
+                try:
+                    data = orjson.loads(content)
+                    formatted = orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
+                    return formatted, None
+                except orjson.JSONDecodeError:
+                    # json also accepts NaN/Infinity; let it decide
+                    pass
+            
             # Parse and format JSON
             data = json.loads(content)
             formatted = json.dumps(data, indent=2, ensure_ascii=False, sort_keys=False)
@@ -107,12 +190,18 @@ class Formatters:
             return None, str(e)
     
     @staticmethod
+    @functools.lru_cache(maxsize=FORMAT_CACHE_SIZE)
     def format_python(content):
         """Format Python content using basic formatting"""
         try:
-            if not content.strip():
+            if not _NONSPACE.search(content):
                 return None, "No content to format"
             
+            black = optional_import('black')
+            if black is not None:
+                formatted = black.format_str(content, mode=black.Mode(line_length=100))
+                return formatted.rstrip('\n'), None
+            
             # Basic Python formatting: fix indentation and spacing
             lines = content.split('\n')
             formatted_lines = []
@@ -126,7 +215,7 @@ class Formatters:
                     continue
                 
                 # Decrease indent for certain keywords
-                if stripped.startswith(('elif ', 'else:', 'except', 'finally:', 'except ')):
+                if stripped.startswith(_PY_DEDENT):
                     indent_level = max(0, indent_level - 1)
                 
                 # Add proper indentation
@@ -136,7 +225,7 @@ class Formatters:
                 # Increase indent for certain patterns
                 if stripped.endswith(':'):
                     indent_level += 1
-                elif stripped.startswith(('return ', 'break', 'continue', 'pass', 'raise ')):
+                elif stripped.startswith(_PY_DEDENT_NEXT):
                     indent_level = max(0, indent_level - 1)
             
             formatted = '\n'.join(formatted_lines)
@@ -145,58 +234,50 @@ class Formatters:
             return None, str(e)
     
     @staticmethod
+    @functools.lru_cache(maxsize=FORMAT_CACHE_SIZE)
     def format_css(content):
         """Format CSS content"""
         try:
-            if not content.strip():
+            if not _NONSPACE.search(content):
                 return None, "No content to format"
             
-            # Basic CSS formatting
-            formatted = ""
-            indent_level = 0
-            in_rule = False
+            # Break lines around braces and semicolons in a few bulk passes
+            formatted = _CSS_OPEN.sub(' {\n', content)
+            formatted = _CSS_CLOSE.sub('\n}\n', formatted)
+            formatted = _CSS_SEMI.sub(';\n', formatted)
             
-            for char in content:
-                if char == '{':
-                    formatted += ' {\n'
-                    indent_level += 1
-                    in_rule = True
-                    formatted += ' ' * (indent_level * 2)
-                elif char == '}':
+            # Re-indent line by line based on brace depth
+            formatted_lines = []
+            indent_level = 0
+            for line in formatted.split('\n'):
+                stripped = line.strip()
+                if not stripped:
+                    continue
+                if stripped.startswith('}'):
                     indent_level = max(0, indent_level - 1)
-                    formatted += '\n' + ' ' * (indent_level * 2) + '}'
-                    in_rule = False
-                elif char == ';':
-                    formatted += ';\n'
-                    if in_rule:
-                        formatted += ' ' * (indent_level * 2)
-                elif char == '\n':
-                    # Skip extra newlines
-                    if formatted and formatted[-1] != '\n':
-                        formatted += ' '
-                else:
-                    formatted += char
-            
-            # Clean up extra spaces
-            lines = formatted.split('\n')
-            cleaned_lines = []
-            for line in lines:
-                cleaned = line.rstrip()
-                if cleaned or (cleaned_lines and cleaned_lines[-1].strip()):
-                    cleaned_lines.append(cleaned)
+                formatted_lines.append('  ' * indent_level + stripped)
+                if stripped.endswith('{'):
+                    indent_level += 1
             
-            formatted = '\n'.join(cleaned_lines)
+            formatted = '\n'.join(formatted_lines)
             return formatted, None
         except Exception as e:
             return None, str(e)
     
     @staticmethod
+    @functools.lru_cache(maxsize=FORMAT_CACHE_SIZE)
     def format_javascript(content):
         """Format JavaScript content"""
         try:
-            if not content.strip():
+            if not _NONSPACE.search(content):
                 return None, "No content to format"
             
+            jsbeautifier = optional_import('jsbeautifier')
+            if jsbeautifier is not None:
+                options = jsbeautifier.default_options()
+                options.indent_size = 2
+                return jsbeautifier.beautify(content, options), None
+            
             # Basic JavaScript formatting (similar to Python)
             lines = content.split('\n')
             formatted_lines = []
@@ -210,7 +291,7 @@ class Formatters:
                     continue
                 
                 # Decrease indent for closing braces/brackets
-                if stripped.startswith(('}', ']')):
+                if stripped.startswith(_JS_DEDENT):
                     indent_level = max(0, indent_level - 1)
                 
                 # Add proper indentation
@@ -218,7 +299,7 @@ class Formatters:
                 formatted_lines.append(formatted_line)
                 
                 # Increase indent for opening braces
-                if stripped.endswith(('{', '[')):
+                if stripped.endswith(_JS_INDENT_SUFFIX):
                     indent_level += 1
                 elif stripped.endswith(';') and not stripped.startswith(('if', 'for', 'while', 'switch')):
                     # End of statement
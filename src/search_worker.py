@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Search Worker Module
+Finds match positions in large documents on a background thread
+"""
+
+from array import array
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class SearchWorkerSignals(QObject):
+    """Signals emitted by SearchWorker (QRunnable cannot emit signals itself)"""
+    
+    # (generation, positions) - generation identifies the request
+    finished = pyqtSignal(int, object)
+
+
+class SearchWorker(QRunnable):
+    """Background job that collects the start of every match of a pattern"""
+    
+    def __init__(self, generation, pattern, content):
+        super().__init__()
+        self.generation = generation
+        self.pattern = pattern
+        self.content = content
+        self.signals = SearchWorkerSignals()
+    
+    def run(self):
+        """Scan content and report the positions through signals.finished"""
+        positions = array('q', (match.start() for match in self.pattern.finditer(self.content)))
+        self.signals.finished.emit(self.generation, positions)
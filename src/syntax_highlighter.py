@@ -5,22 +5,342 @@ Syntax Highlighter Module
 Provides syntax highlighting for multiple programming languages
 """
 
-from PyQt5.QtCore import QRegExp
+import re
+import string
+from itertools import accumulate
+
+from PyQt5.QtCore import QRegularExpression, QTimer
 from PyQt5.QtGui import (QTextCharFormat, QFont, QColor, QSyntaxHighlighter)
 
 
+# Blocks highlighted per event loop pass when a whole document is (re)done
+REHIGHLIGHT_BATCH = 200
+
+# Rules only scan this many characters of a block; the rest of a longer
+# line (e.g. minified JSON) is left plain so typing in it stays responsive
+MAX_BLOCK_SCAN = 16384
+
+# Trigger characters for rules that can only match text containing a digit
+DIGITS = '0123456789'
+
+# Compiled trigger character classes, shared by all rules (see trigger_search)
+_trigger_searches = {}
+
+# Characters matched by \w in the rule patterns (PCRE2 without UCP is ASCII)
+WORD_CHARS = frozenset(string.ascii_letters + string.digits + '_')
+
+# Whole words; keywords are picked out of these by a set lookup
+IDENTIFIER = r'\b[A-Za-z_]\w*+'
+
+PYTHON_KEYWORDS = frozenset([
+    'def', 'class', 'import', 'from', 'if', 'else', 'elif',
+    'for', 'while', 'try', 'except', 'finally', 'return',
+    'yield', 'with', 'as', 'pass', 'break', 'continue',
+    'and', 'or', 'not', 'in', 'is', 'None', 'True', 'False',
+    'lambda', 'raise', 'assert', 'del', 'global', 'nonlocal',
+])
+
+JAVASCRIPT_KEYWORDS = frozenset([
+    'function', 'var', 'let', 'const', 'if', 'else', 'for',
+    'while', 'return', 'true', 'false', 'null', 'undefined',
+    'this', 'new', 'class', 'extends', 'import', 'export',
+    'async', 'await', 'try', 'catch', 'finally', 'throw',
+    'switch', 'case', 'default', 'break', 'continue', 'do',
+])
+
+
+def trigger_search(chars):
+    """Get a search function finding the first of the given characters in a block"""
+    search = _trigger_searches.get(chars)
+    if search is None:
+        # A single character class scans the block once, in C
+        search = re.compile('[' + re.escape(chars) + ']').search
+        _trigger_searches[chars] = search
+    return search
+
+
+def utf16_offsets(text):
+    """Map code point offsets in text to the UTF-16 offsets setFormat expects
+    
+    Returns None when both are the same, i.e. text has no characters outside
+    the BMP; otherwise a list with one entry per offset 0..len(text).
+    """
+    if text.isascii() or max(text) <= '\uffff':
+        return None
+    return [0] + list(accumulate(2 if char > '\uffff' else 1 for char in text))
+
+
+def literal_scanner(words):
+    """Build a scanner for a few short whole-word literals (e.g. true/false/null)
+    
+    Candidates are dispatched on their first character, found with str.find,
+    so a block is only looked at where one of those characters occurs.
+    Yielded offsets are in UTF-16 code units, like those of QRegularExpression.
+    """
+    by_first = {}
+    for word in sorted(set(words), key=len, reverse=True):
+        by_first.setdefault(word[0], []).append(word)
+    
+    def scan(text):
+        length = len(text)
+        offsets = utf16_offsets(text)
+        for first, candidates in by_first.items():
+            pos = text.find(first)
+            while pos != -1:
+                if pos == 0 or text[pos - 1] not in WORD_CHARS:
+                    for word in candidates:
+                        end = pos + len(word)
+                        if text.startswith(word, pos) and (end == length or text[end] not in WORD_CHARS):
+                            if offsets is None:
+                                yield pos, len(word)
+                            else:
+                                yield offsets[pos], offsets[end] - offsets[pos]
+                            break
+                pos = text.find(first, pos + 1)
+    
+    return scan
+
+
+def token_scanner(tokens):
+    """Build a scanner matching several token patterns in a single regex pass
+    
+    tokens is a list of (pattern, format) pairs without capturing groups.
+    Matches do not overlap; where several patterns match at the same
+    position the earliest in the list wins. Yields (start, length, format).
+    A format may also be a dict mapping token text to formats (e.g. the
+    keywords among identifiers); tokens missing from it are left plain.
+    Adjacent tokens with the same format are merged into one run, which
+    saves setFormat calls on dense text such as operator sequences.
+    """
+    expression = QRegularExpression('|'.join('(%s)' % pattern for pattern, _ in tokens))
+    expression.optimize()
+    # Only the matching alternative's group captures, so the last captured
+    # group index identifies the token
+    formats = [None] + [format for _, format in tokens]
+    
+    def scan(text):
+        run_start = run_end = 0
+        run_format = None
+        matches = expression.globalMatch(text)
+        while matches.hasNext():
+            match = matches.next()
+            format = formats[match.lastCapturedIndex()]
+            if format.__class__ is dict:
+                format = format.get(match.captured())
+                if format is None:
+                    continue
+            start = match.capturedStart()
+            if format is run_format and start == run_end:
+                run_end += match.capturedLength()
+                continue
+            if run_format is not None:
+                yield run_start, run_end - run_start, run_format
+            run_start = start
+            run_end = start + match.capturedLength()
+            run_format = format
+        if run_format is not None:
+            yield run_start, run_end - run_start, run_format
+    
+    return scan
+
+
+def _mkfmt(color, bold=False, italic=False, underline=False):
+    """Build a QTextCharFormat for a foreground color (0xRRGGBB) and font style"""
+    fmt = QTextCharFormat()
+    fmt.setForeground(QColor.fromRgb(color | 0xFF000000))
+    if bold:
+        fmt.setFontWeight(QFont.Bold)
+    if italic:
+        fmt.setFontItalic(True)
+    if underline:
+        fmt.setUnderlineStyle(QTextCharFormat.SingleUnderline)
+    return fmt
+
+
+def _theme_formats(table, theme):
+    """Pick the light or dark format set of a language (dark is the default)"""
+    return table['light'] if theme == 'light' else table['dark']
+
+
+# Text formats per language and theme, built once and shared by every rule
+
+# XML - Beautiful balanced colors for comfortable coding
+XML_FORMATS = {
+    'light': {
+        # Light theme colors - Balanced and readable
+        'declaration': _mkfmt(0x1976D2, bold=True),  # Deep Blue - XML declaration
+        'tag': _mkfmt(0x7C4DFF, bold=True),  # Rich Lavender - tags (darker, more visible)
+        'closing_tag': _mkfmt(0x9C27B0, bold=True),  # Deep Purple - closing tags
+        'namespace': _mkfmt(0x9C27B0, bold=True),  # Purple - namespace prefixes
+        'attr': _mkfmt(0xE91E63, bold=True),  # Pink - attributes (clearer)
+        'attr_value': _mkfmt(0x2196F3),  # Blue - attribute values
+        'comment': _mkfmt(0x4CAF50, italic=True),  # Green - comments
+        'cdata': _mkfmt(0xFF9800, bold=True),  # Orange - CDATA
+        'pi': _mkfmt(0x1976D2, italic=True),  # Deep Blue - processing instructions
+    },
+    'dark': {
+        # Dark theme colors - Balanced, readable, not too bright
+        'declaration': _mkfmt(0x90CAF9, bold=True),  # Light Blue - XML declaration
+        'tag': _mkfmt(0x82B1FF, bold=True),  # Medium Blue - opening tags (clearer)
+        'closing_tag': _mkfmt(0x80CBC4, bold=True),  # Teal - closing tags
+        'namespace': _mkfmt(0xCE93D8, bold=True),  # Light Purple - namespace prefixes
+        'attr': _mkfmt(0xF48FB1, bold=True),  # Medium Pink - attributes
+        'attr_value': _mkfmt(0xFFCC80),  # Amber - attribute values
+        'comment': _mkfmt(0xA5D6A7, italic=True),  # Light Green - comments
+        'cdata': _mkfmt(0xFFE082, bold=True),  # Light Yellow - CDATA
+        'pi': _mkfmt(0x90CAF9, italic=True),  # Light Blue - processing instructions
+    },
+}
+
+# JSON - VS Code Dark+/Light+ theme
+JSON_FORMATS = {
+    'light': {
+        'key': _mkfmt(0x0451A5),  # Blue
+        'string': _mkfmt(0xA31515),  # Dark Red
+        'number': _mkfmt(0x098658),  # Green
+        'keyword': _mkfmt(0x0000FF, bold=True),  # Blue
+    },
+    'dark': {
+        'key': _mkfmt(0x9CDCFE),  # Light Blue - keys
+        'string': _mkfmt(0xCE9178),  # Orange - strings
+        'number': _mkfmt(0xB5CEA8),  # Light Green - numbers
+        'keyword': _mkfmt(0x569CD6, bold=True),  # Cyan Blue - keywords (true, false, null)
+    },
+}
+
+# Python and JavaScript - VS Code Dark+/Light+ theme
+CODE_FORMATS = {
+    'light': {
+        'keyword': _mkfmt(0x0000FF, bold=True),  # Blue
+        'string': _mkfmt(0xA31515),  # Dark Red
+        'comment': _mkfmt(0x008000, italic=True),  # Green
+        'number': _mkfmt(0x098658),  # Green
+        'function': _mkfmt(0x795E26),  # Brown
+        'class': _mkfmt(0x267F99, bold=True),  # Teal
+    },
+    'dark': {
+        'keyword': _mkfmt(0x569CD6, bold=True),  # Cyan Blue - keywords
+        'string': _mkfmt(0xCE9178),  # Orange - strings
+        'comment': _mkfmt(0x6A9955, italic=True),  # Green - comments
+        'number': _mkfmt(0xB5CEA8),  # Light Green - numbers
+        'function': _mkfmt(0xDCDCAA),  # Beige - functions
+        'class': _mkfmt(0x4EC9B0, bold=True),  # Cyan - classes
+    },
+}
+
+# CSS - VS Code Dark+/Light+ theme
+CSS_FORMATS = {
+    'light': {
+        'selector': _mkfmt(0x800000),  # Maroon
+        'property': _mkfmt(0xFF0000),  # Red
+        'value': _mkfmt(0x0451A5),  # Blue
+        'comment': _mkfmt(0x008000, italic=True),  # Green
+        'unit': _mkfmt(0x098658),  # Green
+    },
+    'dark': {
+        'selector': _mkfmt(0xD7BA7D),  # Yellow/Beige - selectors
+        'property': _mkfmt(0x9CDCFE),  # Light Blue - properties
+        'value': _mkfmt(0xCE9178),  # Orange - values
+        'comment': _mkfmt(0x6A9955, italic=True),  # Green - comments
+        'unit': _mkfmt(0xB5CEA8),  # Light Green - units (px, em, etc.)
+    },
+}
+
+# Generic text - Beautiful and colorful
+GENERIC_FORMATS = {
+    'light': {
+        # Light theme colors - Beautiful and readable
+        'string': _mkfmt(0xA31515),  # Rich Red - strings
+        'comment': _mkfmt(0x008000, italic=True),  # Forest Green - comments
+        'number': _mkfmt(0x098658),  # Emerald Green - numbers
+        'keyword': _mkfmt(0x0000FF, bold=True),  # Pure Blue - keywords
+        'url': _mkfmt(0x0066CC, underline=True),  # Bright Blue - URLs
+        'email': _mkfmt(0x0066CC, underline=True),  # Bright Blue - emails
+        'path': _mkfmt(0x8B4513),  # Chocolate Brown - file paths
+        'date': _mkfmt(0x007ACC),  # Azure Blue - dates/times
+        'ip': _mkfmt(0x9B26B6, bold=True),  # Vibrant Purple - IP addresses
+        'hex': _mkfmt(0x0E7C0E, bold=True),  # Forest Green - hex colors
+        'version': _mkfmt(0x005A9E, bold=True),  # Deep Blue - version numbers
+        'boolean': _mkfmt(0x0000FF, bold=True),  # Pure Blue - true/false
+        'operator': _mkfmt(0x333333),  # Charcoal Gray - operators
+        'bracket': _mkfmt(0x666666, bold=True),  # Medium Gray - brackets
+        'error': _mkfmt(0xE51400, bold=True),  # Bright Red - error keywords
+        'success': _mkfmt(0x0E7C0E, bold=True),  # Forest Green - success keywords
+    },
+    'dark': {
+        # Dark theme colors - VS Code Dark+ Enhanced (Beautiful & Readable)
+        'string': _mkfmt(0xCE9178),  # Warm Peach - strings (very readable)
+        'comment': _mkfmt(0x6A9955, italic=True),  # Soft Mint - comments
+        'number': _mkfmt(0xB5CEA8),  # Pale Green - numbers
+        'keyword': _mkfmt(0x569CD6, bold=True),  # Sky Blue - keywords
+        'url': _mkfmt(0x4EC9B0, underline=True),  # Aqua Cyan - URLs
+        'email': _mkfmt(0x4EC9B0, underline=True),  # Aqua Cyan - emails
+        'path': _mkfmt(0xDCDCAA),  # Light Khaki - file paths
+        'date': _mkfmt(0x4EC9B0),  # Aqua Cyan - dates/times
+        'ip': _mkfmt(0xC586C0, bold=True),  # Soft Lavender - IP addresses
+        'hex': _mkfmt(0xB5CEA8, bold=True),  # Pale Green - hex colors
+        'version': _mkfmt(0x9CDCFE, bold=True),  # Light Cyan - version numbers
+        'boolean': _mkfmt(0x569CD6, bold=True),  # Sky Blue - true/false
+        'operator': _mkfmt(0xD4D4D4),  # Light Silver - operators
+        'bracket': _mkfmt(0x808080, bold=True),  # Medium Gray - brackets
+        'error': _mkfmt(0xF48771, bold=True),  # Coral Pink - error keywords
+        'success': _mkfmt(0x89D185, bold=True),  # Light Lime - success keywords
+    },
+}
+
+
 class SyntaxHighlighter(QSyntaxHighlighter):
     """Syntax highlighter for multiple languages"""
     
-    def __init__(self, parent=None, language='xml', theme='dark'):
+    # Built (rules, spans) shared by all highlighters, keyed by (language, theme)
+    _rules_cache = {}
+    
+    def __init__(self, parent=None, language='xml', theme='dark', first_block=0):
         super().__init__(parent)
         self.language = language
         self.theme = theme
         self.highlighting_rules = []
+        self.span_rules = []
+        
+        # Document pass in progress: next block number and blocks left
+        self.rehighlight_timer = QTimer(self)
+        self.rehighlight_timer.setInterval(0)
+        self.rehighlight_timer.timeout.connect(self.rehighlight_batch)
+        self.rehighlight_next = 0
+        self.rehighlight_left = 0
+        
+        # Let the document show as plain text, then set up the rules (built and
+        # JIT-compiled on first use) and highlight from first_block onwards in
+        # batches. Until then highlightBlock leaves blocks plain, so the full
+        # pass QSyntaxHighlighter schedules on attaching does next to nothing
+        self._setup_pending = True
+        self._first_block = first_block
+        QTimer.singleShot(0, self._deferred_setup)
+    
+    def _deferred_setup(self):
+        """Build rules scheduled by __init__, then highlight the document"""
+        if not self._setup_pending:
+            return
         self.setup_highlighting()
+        self.rehighlight_from(self._first_block)
+    
+    def rules_cache_key(self):
+        """Key of this highlighter's rules in the shared rules cache"""
+        # HTML is highlighted with the XML rules, so both share one entry
+        language = 'xml' if self.language == 'html' else self.language
+        return (language, self.theme)
     
     def setup_highlighting(self):
         """Setup highlighting rules based on language"""
+        self._setup_pending = False
+        key = self.rules_cache_key()
+        cached = SyntaxHighlighter._rules_cache.get(key)
+        if cached is not None:
+            self.highlighting_rules, self.span_rules = cached
+            return
+        
+        self.highlighting_rules = []
+        self.span_rules = []
         if self.language == 'xml':
             self.setup_xml_highlighting()
         elif self.language == 'json':
@@ -35,213 +355,163 @@ class SyntaxHighlighter(QSyntaxHighlighter):
             self.setup_javascript_highlighting()
         else:
             self.setup_generic_highlighting()
+        # Compile the patterns now rather than on the first highlighted block
+        for expression, _, _, _ in self.highlighting_rules:
+            if expression is not None:
+                expression.optimize()
+        SyntaxHighlighter._rules_cache[key] = (self.highlighting_rules, self.span_rules)
+    
+    def add_rule(self, pattern, format, triggers=None):
+        """Add a highlighting rule
+        
+        triggers: characters of which at least one must occur in a block for
+        the pattern to possibly match; blocks without any of them skip the
+        regex entirely. None means the rule always runs.
+        """
+        if triggers is not None:
+            triggers = trigger_search(triggers)
+        self.highlighting_rules.append((QRegularExpression(pattern), format, triggers, None))
+    
+    def add_scanner(self, scan, format, triggers=None):
+        """Add a rule matched by a scanner function instead of a regex
+        
+        scan(text) must yield (start, length) pairs to format, or
+        (start, length, format) triples when format is None.
+        """
+        if triggers is not None:
+            triggers = trigger_search(triggers)
+        self.highlighting_rules.append((None, format, triggers, scan))
+    
+    def add_literals(self, words, format):
+        """Add a rule highlighting a handful of whole-word literal values"""
+        self.add_scanner(literal_scanner(words), format, ''.join(sorted({word[0] for word in words})))
+    
+    def add_span(self, start, end, format):
+        """Add a delimited span (e.g. a comment) that may continue over several blocks
+        
+        Spans are found with plain substring scans; a block that ends inside
+        span N gets block state N + 1 so the next block resumes it.
+        """
+        self.span_rules.append((start, end, format))
     
-    def set_theme(self, theme):
-        """Update theme and reapply highlighting"""
+    def set_theme(self, theme, first_block=0):
+        """Update theme and reapply highlighting, starting at block number first_block
+        
+        The first batch of blocks (normally the visible ones) is redone right
+        away; the rest of the document follows from the event loop.
+        """
         self.theme = theme
-        self.highlighting_rules = []
         self.setup_highlighting()
-        self.rehighlight()
+        self.rehighlight_from(first_block)
+    
+    def rehighlight_from(self, first_block):
+        """Highlight the document in batches, the first one (from first_block) right away"""
+        document = self.document()
+        if document is None:
+            return
+        self.rehighlight_next = min(first_block, document.blockCount() - 1)
+        self.rehighlight_left = document.blockCount()
+        self.rehighlight_batch()
+    
+    def rehighlight_batch(self):
+        """Re-highlight the next REHIGHLIGHT_BATCH blocks, wrapping at the end"""
+        document = self.document()
+        if document is None:
+            self.rehighlight_timer.stop()
+            return
+        block = document.findBlockByNumber(self.rehighlight_next)
+        count = min(REHIGHLIGHT_BATCH, self.rehighlight_left)
+        self.rehighlight_left -= count
+        for _ in range(count):
+            if not block.isValid():
+                block = document.begin()
+            self.rehighlightBlock(block)
+            block = block.next()
+        self.rehighlight_next = block.blockNumber() if block.isValid() else 0
+        if self.rehighlight_left > 0:
+            self.rehighlight_timer.start()
+        else:
+            self.rehighlight_timer.stop()
     
     def setup_xml_highlighting(self):
         """XML syntax highlighting - Beautiful balanced colors for comfortable coding"""
-        if self.theme == 'light':
-            # Light theme colors - Balanced and readable
-            tag_color = "#7C4DFF"  # Rich Lavender - tags (darker, more visible)
-            closing_tag_color = "#9C27B0"  # Deep Purple - closing tags
-            attr_color = "#E91E63"  # Pink - attributes (clearer)
-            attr_value_color = "#2196F3"  # Blue - attribute values
-            comment_color = "#4CAF50"  # Green - comments
-            cdata_color = "#FF9800"  # Orange - CDATA
-            text_color = "#424242"  # Dark Gray - text content
-            declaration_color = "#1976D2"  # Deep Blue - XML declaration
-            namespace_color = "#9C27B0"  # Purple - namespace prefixes
-        else:
-            # Dark theme colors - Balanced, readable, not too bright
-            tag_color = "#82B1FF"  # Medium Blue - opening tags (clearer)
-            closing_tag_color = "#80CBC4"  # Teal - closing tags
-            attr_color = "#F48FB1"  # Medium Pink - attributes
-            attr_value_color = "#FFCC80"  # Amber - attribute values
-            comment_color = "#A5D6A7"  # Light Green - comments
-            cdata_color = "#FFE082"  # Light Yellow - CDATA
-            text_color = "#E0E0E0"  # Light Gray - text content
-            declaration_color = "#90CAF9"  # Light Blue - XML declaration
-            namespace_color = "#CE93D8"  # Light Purple - namespace prefixes
+        fmt = _theme_formats(XML_FORMATS, self.theme)
         
         # XML Declaration - <?xml ... ?>
-        declaration_format = QTextCharFormat()
-        declaration_format.setForeground(QColor(declaration_color))
-        declaration_format.setFontWeight(QFont.Bold)
-        self.highlighting_rules.append((QRegExp(r'<\?xml[^?>]*\?>'), declaration_format))
-        
-        # Opening Tags - <tag> or <tag ...>
-        opening_tag_format = QTextCharFormat()
-        opening_tag_format.setForeground(QColor(tag_color))
-        opening_tag_format.setFontWeight(QFont.Bold)
-        # Match opening tags (not closing, not self-closing)
-        self.highlighting_rules.append((QRegExp(r'<(?!/)[\w:]+(?:\s+[^>]*)?(?<!/)>'), opening_tag_format))
+        self.add_rule(r'<\?xml[^?>]*+\?>', fmt['declaration'], '<')
+        
+        # Opening Tags - <tag> or <tag ...> (not closing, not self-closing)
+        self.add_rule(r'<(?!/)[\w:]+(?:\s+[^>]*)?(?<!/)>', fmt['tag'], '<')
         
         # Closing Tags - </tag>
-        closing_tag_format = QTextCharFormat()
-        closing_tag_format.setForeground(QColor(closing_tag_color))
-        closing_tag_format.setFontWeight(QFont.Bold)
-        self.highlighting_rules.append((QRegExp(r'</[\w:]+>'), closing_tag_format))
+        self.add_rule(r'</[\w:]++>', fmt['closing_tag'], '<')
         
         # Self-closing Tags - <tag/>
-        self_closing_format = QTextCharFormat()
-        self_closing_format.setForeground(QColor(tag_color))
-        self_closing_format.setFontWeight(QFont.Bold)
-        self.highlighting_rules.append((QRegExp(r'<[\w:]+\s+[^>]*/>'), self_closing_format))
+        self.add_rule(r'<[\w:]+\s+[^>]*/>', fmt['tag'], '<')
         
         # Namespace prefixes - xmlns, xsi, etc.
-        namespace_format = QTextCharFormat()
-        namespace_format.setForeground(QColor(namespace_color))
-        namespace_format.setFontWeight(QFont.Bold)
-        self.highlighting_rules.append((QRegExp(r'\bxmlns(?::\w+)?\b'), namespace_format))
-        self.highlighting_rules.append((QRegExp(r'\bxsi(?::\w+)?\b'), namespace_format))
-        
-        # XML Attributes - match attribute names (improved)
-        attr_format = QTextCharFormat()
-        attr_format.setForeground(QColor(attr_color))
-        attr_format.setFontWeight(QFont.Bold)
-        # Match attribute names before = (including namespace prefixes)
-        self.highlighting_rules.append((QRegExp(r'\s+[\w:-]+\s*='), attr_format))
-        
-        # Attribute Values - match quoted values (improved)
-        attr_value_format = QTextCharFormat()
-        attr_value_format.setForeground(QColor(attr_value_color))
-        # Match attribute values in single or double quotes
-        self.highlighting_rules.append((QRegExp(r'=\s*"[^"]*"'), attr_value_format))
-        self.highlighting_rules.append((QRegExp(r"=\s*'[^']*'"), attr_value_format))
-        
-        # Comments - multi-line support (improved)
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(QColor(comment_color))
-        comment_format.setFontItalic(True)
-        # Match comments (including multi-line) - more robust
-        self.highlighting_rules.append((QRegExp(r'<!--[^-]*(?:-(?!->)[^-]*)*-->'), comment_format))
-        
-        # CDATA sections (improved)
-        cdata_format = QTextCharFormat()
-        cdata_format.setForeground(QColor(cdata_color))
-        cdata_format.setFontWeight(QFont.Bold)
-        # Match CDATA with better regex
-        self.highlighting_rules.append((QRegExp(r'<!\[CDATA\[.*?\]\]>'), cdata_format))
+        self.add_rule(r'\bxmlns(?::\w+)?\b', fmt['namespace'])
+        self.add_rule(r'\bxsi(?::\w+)?\b', fmt['namespace'])
+        
+        # XML Attributes - attribute names before = (including namespace prefixes)
+        self.add_rule(r'\s+[\w:-]+\s*=', fmt['attr'], '=')
+        
+        # Attribute Values - values in single or double quotes
+        self.add_rule(r'=\s*"[^"]*+"', fmt['attr_value'], '=')
+        self.add_rule(r"=\s*'[^']*+'", fmt['attr_value'], '=')
         
         # Processing Instructions - <?pi ... ?>
-        pi_format = QTextCharFormat()
-        pi_format.setForeground(QColor(declaration_color))
-        pi_format.setFontItalic(True)
-        self.highlighting_rules.append((QRegExp(r'<\?[\w-]+\s+[^?>]*\?>'), pi_format))
+        self.add_rule(r'<\?[\w-]+\s+[^?>]*+\?>', fmt['pi'], '<')
+        
+        # Comments and CDATA sections (may span multiple lines)
+        self.add_span('<!--', '-->', fmt['comment'])
+        self.add_span('<![CDATA[', ']]>', fmt['cdata'])
     
     def setup_json_highlighting(self):
         """JSON syntax highlighting - VS Code Dark+ theme"""
-        if self.theme == 'light':
-            # Light theme colors (VS Code Light+)
-            key_color = "#0451A5"  # Blue
-            string_color = "#A31515"  # Dark Red
-            number_color = "#098658"  # Green
-            keyword_color = "#0000FF"  # Blue
-            punctuation_color = "#000000"  # Black
-        else:
-            # Dark theme colors (VS Code Dark+)
-            key_color = "#9CDCFE"  # Light Blue - keys
-            string_color = "#CE9178"  # Orange - strings
-            number_color = "#B5CEA8"  # Light Green - numbers
-            keyword_color = "#569CD6"  # Cyan Blue - keywords (true, false, null)
-            punctuation_color = "#D4D4D4"  # Light Gray - brackets, commas
-        
-        # Keys - JSON property names
-        key_format = QTextCharFormat()
-        key_format.setForeground(QColor(key_color))
-        # Match key: pattern (key name before colon)
-        self.highlighting_rules.append((QRegExp(r'"([^"]+)"\s*:'), key_format))
-        
-        # Strings - JSON string values
-        string_format = QTextCharFormat()
-        string_format.setForeground(QColor(string_color))
-        # Match string values (not keys)
-        self.highlighting_rules.append((QRegExp(r':\s*"[^"]*"'), string_format))
+        fmt = _theme_formats(JSON_FORMATS, self.theme)
+        
+        # Keys - JSON property names (key name before colon)
+        self.add_rule(r'"([^"]++)"\s*:', fmt['key'], '"')
+        
+        # Strings - JSON string values (not keys)
+        self.add_rule(r':\s*"[^"]*+"', fmt['string'], '"')
         # Also match standalone strings in arrays
-        self.highlighting_rules.append((QRegExp(r'(?:^|,|\s)\s*"[^"]*"(?=\s*[,}\]])'), string_format))
+        self.add_rule(r'(?:^|,|\s)\s*"[^"]*+"(?=\s*[,}\]])', fmt['string'], '"')
         
-        # Numbers - integers and floats
-        number_format = QTextCharFormat()
-        number_format.setForeground(QColor(number_color))
-        # Match numbers (integers and decimals)
-        self.highlighting_rules.append((QRegExp(r'\b\d+\.?\d*\b'), number_format))
+        # Numbers - integers and decimals
+        self.add_rule(r'\b\d+\.?\d*\b', fmt['number'], DIGITS)
         
         # Keywords (true, false, null)
-        keyword_format = QTextCharFormat()
-        keyword_format.setForeground(QColor(keyword_color))
-        keyword_format.setFontWeight(QFont.Bold)
-        self.highlighting_rules.append((QRegExp(r'\b(true|false|null)\b'), keyword_format))
+        self.add_literals(['true', 'false', 'null'], fmt['keyword'])
     
     def setup_python_highlighting(self):
         """Python syntax highlighting - VS Code Dark+ theme"""
-        if self.theme == 'light':
-            # Light theme colors (VS Code Light+)
-            keyword_color = "#0000FF"  # Blue
-            string_color = "#A31515"  # Dark Red
-            comment_color = "#008000"  # Green
-            number_color = "#098658"  # Green
-            function_color = "#795E26"  # Brown
-            class_color = "#267F99"  # Teal
-        else:
-            # Dark theme colors (VS Code Dark+)
-            keyword_color = "#569CD6"  # Cyan Blue - keywords
-            string_color = "#CE9178"  # Orange - strings
-            comment_color = "#6A9955"  # Green - comments
-            number_color = "#B5CEA8"  # Light Green - numbers
-            function_color = "#DCDCAA"  # Beige - functions
-            class_color = "#4EC9B0"  # Cyan - classes
+        fmt = _theme_formats(CODE_FORMATS, self.theme)
         
         # Keywords
-        keyword_format = QTextCharFormat()
-        keyword_format.setForeground(QColor(keyword_color))
-        keyword_format.setFontWeight(QFont.Bold)
-        keywords = ['def', 'class', 'import', 'from', 'if', 'else', 'elif', 
-                   'for', 'while', 'try', 'except', 'finally', 'return', 
-                   'yield', 'with', 'as', 'pass', 'break', 'continue', 
-                   'and', 'or', 'not', 'in', 'is', 'None', 'True', 'False',
-                   'lambda', 'raise', 'assert', 'del', 'global', 'nonlocal']
-        for keyword in keywords:
-            self.highlighting_rules.append((QRegExp(r'\b' + keyword + r'\b'), keyword_format))
-        
-        # Functions - def function_name
-        function_format = QTextCharFormat()
-        function_format.setForeground(QColor(function_color))
-        self.highlighting_rules.append((QRegExp(r'\bdef\s+(\w+)'), function_format))
-        
-        # Classes - class ClassName
-        class_format = QTextCharFormat()
-        class_format.setForeground(QColor(class_color))
-        class_format.setFontWeight(QFont.Bold)
-        self.highlighting_rules.append((QRegExp(r'\bclass\s+(\w+)'), class_format))
-        
-        # Strings - single and double quotes, triple quotes
-        string_format = QTextCharFormat()
-        string_format.setForeground(QColor(string_color))
-        # Single line strings
-        self.highlighting_rules.append((QRegExp(r'"[^"]*"'), string_format))
-        self.highlighting_rules.append((QRegExp(r"'[^']*'"), string_format))
-        # Triple quoted strings (multi-line)
-        self.highlighting_rules.append((QRegExp(r'"""[^"]*"""'), string_format))
-        self.highlighting_rules.append((QRegExp(r"'''[^']*'''"), string_format))
-        
-        # Comments
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(QColor(comment_color))
-        comment_format.setFontItalic(True)
-        self.highlighting_rules.append((QRegExp(r'#.*'), comment_format))
-        
-        # Numbers - integers, floats, hex, binary
-        number_format = QTextCharFormat()
-        number_format.setForeground(QColor(number_color))
-        # Match numbers (integers, floats, hex, binary)
-        self.highlighting_rules.append((QRegExp(r'\b\d+\.?\d*\b'), number_format))
-        self.highlighting_rules.append((QRegExp(r'\b0[xX][0-9a-fA-F]+\b'), number_format))
-        self.highlighting_rules.append((QRegExp(r'\b0[bB][01]+\b'), number_format))
+        keywords = dict.fromkeys(PYTHON_KEYWORDS, fmt['keyword'])
+        
+        # Tokenize each block in one pass; earlier tokens win at a position
+        self.add_scanner(token_scanner([
+            # Comments
+            (r'#.*', fmt['comment']),
+            # Triple quoted strings
+            (r'"""[^"]*+"""', fmt['string']),
+            (r"'''[^']*+'''", fmt['string']),
+            # Strings - single and double quotes
+            (r'"[^"]*+"', fmt['string']),
+            (r"'[^']*+'", fmt['string']),
+            # Functions - def function_name
+            (r'\bdef\s+\w+', fmt['function']),
+            # Classes - class ClassName
+            (r'\bclass\s+\w+', fmt['class']),
+            (IDENTIFIER, keywords),
+            # Numbers - hex, binary, integers, floats
+            (r'\b0[xX][0-9a-fA-F]+\b', fmt['number']),
+            (r'\b0[bB][01]+\b', fmt['number']),
+            (r'\b\d+\.?\d*\b', fmt['number']),
+        ]), None)
     
     def setup_html_highlighting(self):
         """HTML syntax highlighting (similar to XML)"""
@@ -249,285 +519,215 @@ class SyntaxHighlighter(QSyntaxHighlighter):
     
     def setup_css_highlighting(self):
         """CSS syntax highlighting - VS Code Dark+ theme"""
-        if self.theme == 'light':
-            selector_color = "#800000"  # Maroon
-            property_color = "#FF0000"  # Red
-            value_color = "#0451A5"  # Blue
-            comment_color = "#008000"  # Green
-            unit_color = "#098658"  # Green
-        else:
-            # Dark theme colors (VS Code Dark+)
-            selector_color = "#D7BA7D"  # Yellow/Beige - selectors
-            property_color = "#9CDCFE"  # Light Blue - properties
-            value_color = "#CE9178"  # Orange - values
-            comment_color = "#6A9955"  # Green - comments
-            unit_color = "#B5CEA8"  # Light Green - units (px, em, etc.)
+        fmt = _theme_formats(CSS_FORMATS, self.theme)
         
         # Selectors - before {
-        selector_format = QTextCharFormat()
-        selector_format.setForeground(QColor(selector_color))
-        self.highlighting_rules.append((QRegExp(r'[^{]+\{'), selector_format))
+        self.add_rule(r'[^{]++\{', fmt['selector'], '{')
         
         # Properties - property name before :
-        property_format = QTextCharFormat()
-        property_format.setForeground(QColor(property_color))
-        self.highlighting_rules.append((QRegExp(r'\s+[\w-]+\s*:'), property_format))
+        self.add_rule(r'\s+[\w-]+\s*:', fmt['property'], ':')
         
         # Values - after : before ;
-        value_format = QTextCharFormat()
-        value_format.setForeground(QColor(value_color))
-        self.highlighting_rules.append((QRegExp(r':\s*[^;]+;'), value_format))
+        self.add_rule(r':\s*[^;]++;', fmt['value'], ':')
         
         # Units in values (px, em, rem, %, etc.)
-        unit_format = QTextCharFormat()
-        unit_format.setForeground(QColor(unit_color))
-        self.highlighting_rules.append((QRegExp(r'\b\d+(?:px|em|rem|%|pt|cm|mm|in|ex|ch|vw|vh|vmin|vmax)\b'), unit_format))
-        
-        # Comments - multi-line support
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(QColor(comment_color))
-        comment_format.setFontItalic(True)
-        # Match CSS comments (including multi-line)
-        self.highlighting_rules.append((QRegExp(r'/\*[^*]*(?:\*(?!/)[^*]*)*\*/'), comment_format))
+        self.add_rule(r'\b\d+(?:px|em|rem|%|pt|cm|mm|in|ex|ch|vw|vh|vmin|vmax)\b', fmt['unit'], DIGITS)
+        
+        # Comments (may span multiple lines)
+        self.add_span('/*', '*/', fmt['comment'])
     
     def setup_javascript_highlighting(self):
         """JavaScript syntax highlighting - VS Code Dark+ theme"""
-        if self.theme == 'light':
-            keyword_color = "#0000FF"  # Blue
-            string_color = "#A31515"  # Dark Red
-            comment_color = "#008000"  # Green
-            number_color = "#098658"  # Green
-            function_color = "#795E26"  # Brown
-            class_color = "#267F99"  # Teal
-        else:
-            # Dark theme colors (VS Code Dark+)
-            keyword_color = "#569CD6"  # Cyan Blue - keywords
-            string_color = "#CE9178"  # Orange - strings
-            comment_color = "#6A9955"  # Green - comments
-            number_color = "#B5CEA8"  # Light Green - numbers
-            function_color = "#DCDCAA"  # Beige - functions
-            class_color = "#4EC9B0"  # Cyan - classes
+        fmt = _theme_formats(CODE_FORMATS, self.theme)
         
         # Keywords
-        keyword_format = QTextCharFormat()
-        keyword_format.setForeground(QColor(keyword_color))
-        keyword_format.setFontWeight(QFont.Bold)
-        keywords = ['function', 'var', 'let', 'const', 'if', 'else', 'for', 
-                   'while', 'return', 'true', 'false', 'null', 'undefined', 
-                   'this', 'new', 'class', 'extends', 'import', 'export',
-                   'async', 'await', 'try', 'catch', 'finally', 'throw',
-                   'switch', 'case', 'default', 'break', 'continue', 'do']
-        for keyword in keywords:
-            self.highlighting_rules.append((QRegExp(r'\b' + keyword + r'\b'), keyword_format))
-        
-        # Functions - function functionName
-        function_format = QTextCharFormat()
-        function_format.setForeground(QColor(function_color))
-        self.highlighting_rules.append((QRegExp(r'\bfunction\s+(\w+)'), function_format))
-        # Arrow functions
-        self.highlighting_rules.append((QRegExp(r'\b(\w+)\s*=>'), function_format))
-        
-        # Classes - class ClassName
-        class_format = QTextCharFormat()
-        class_format.setForeground(QColor(class_color))
-        class_format.setFontWeight(QFont.Bold)
-        self.highlighting_rules.append((QRegExp(r'\bclass\s+(\w+)'), class_format))
-        
-        # Strings - single and double quotes, template literals
-        string_format = QTextCharFormat()
-        string_format.setForeground(QColor(string_color))
-        self.highlighting_rules.append((QRegExp(r'"[^"]*"'), string_format))
-        self.highlighting_rules.append((QRegExp(r"'[^']*'"), string_format))
-        # Template literals
-        self.highlighting_rules.append((QRegExp(r'`[^`]*`'), string_format))
-        
-        # Numbers
-        number_format = QTextCharFormat()
-        number_format.setForeground(QColor(number_color))
-        self.highlighting_rules.append((QRegExp(r'\b\d+\.?\d*\b'), number_format))
-        self.highlighting_rules.append((QRegExp(r'\b0[xX][0-9a-fA-F]+\b'), number_format))
-        
-        # Comments
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(QColor(comment_color))
-        comment_format.setFontItalic(True)
-        # Single line comments
-        self.highlighting_rules.append((QRegExp(r'//.*'), comment_format))
-        # Multi-line comments
-        self.highlighting_rules.append((QRegExp(r'/\*[^*]*(?:\*(?!/)[^*]*)*\*/'), comment_format))
+        keywords = dict.fromkeys(JAVASCRIPT_KEYWORDS, fmt['keyword'])
+        
+        # Tokenize each block in one pass; earlier tokens win at a position
+        self.add_scanner(token_scanner([
+            # Comments - single line and multi-line
+            (r'//.*', fmt['comment']),
+            (r'/\*[^*]*+(?:\*(?!/)[^*]*+)*+\*/', fmt['comment']),
+            # Strings - single and double quotes, template literals
+            (r'"[^"]*+"', fmt['string']),
+            (r"'[^']*+'", fmt['string']),
+            (r'`[^`]*+`', fmt['string']),
+            # Functions - function functionName
+            (r'\bfunction\s+\w+', fmt['function']),
+            # Classes - class ClassName
+            (r'\bclass\s+\w+', fmt['class']),
+            # Arrow functions
+            (r'\b\w+\s*=>', fmt['function']),
+            (IDENTIFIER, keywords),
+            # Numbers
+            (r'\b0[xX][0-9a-fA-F]+\b', fmt['number']),
+            (r'\b\d+\.?\d*\b', fmt['number']),
+        ]), None)
     
     def setup_generic_highlighting(self):
         """Generic highlighting for unknown file types - Beautiful and colorful"""
-        if self.theme == 'light':
-            # Light theme colors - Beautiful and readable
-            string_color = "#A31515"  # Rich Red - strings
-            comment_color = "#008000"  # Forest Green - comments
-            number_color = "#098658"  # Emerald Green - numbers
-            keyword_color = "#0000FF"  # Pure Blue - keywords
-            url_color = "#0066CC"  # Bright Blue - URLs
-            email_color = "#0066CC"  # Bright Blue - emails
-            path_color = "#8B4513"  # Chocolate Brown - file paths
-            date_color = "#007ACC"  # Azure Blue - dates/times
-            ip_color = "#9B26B6"  # Vibrant Purple - IP addresses
-            hex_color = "#0E7C0E"  # Forest Green - hex colors
-            version_color = "#005A9E"  # Deep Blue - version numbers
-            boolean_color = "#0000FF"  # Pure Blue - true/false
-            operator_color = "#333333"  # Charcoal Gray - operators
-            bracket_color = "#666666"  # Medium Gray - brackets
-            error_color = "#E51400"  # Bright Red - error keywords
-            success_color = "#0E7C0E"  # Forest Green - success keywords
-        else:
-            # Dark theme colors - VS Code Dark+ Enhanced (Beautiful & Readable)
-            string_color = "#CE9178"  # Warm Peach - strings (very readable)
-            comment_color = "#6A9955"  # Soft Mint - comments
-            number_color = "#B5CEA8"  # Pale Green - numbers
-            keyword_color = "#569CD6"  # Sky Blue - keywords
-            url_color = "#4EC9B0"  # Aqua Cyan - URLs
-            email_color = "#4EC9B0"  # Aqua Cyan - emails
-            path_color = "#DCDCAA"  # Light Khaki - file paths
-            date_color = "#4EC9B0"  # Aqua Cyan - dates/times
-            ip_color = "#C586C0"  # Soft Lavender - IP addresses
-            hex_color = "#B5CEA8"  # Pale Green - hex colors
-            version_color = "#9CDCFE"  # Light Cyan - version numbers
-            boolean_color = "#569CD6"  # Sky Blue - true/false
-            operator_color = "#D4D4D4"  # Light Silver - operators
-            bracket_color = "#808080"  # Medium Gray - brackets
-            error_color = "#F48771"  # Coral Pink - error keywords
-            success_color = "#89D185"  # Light Lime - success keywords
-        
-        # Strings - single and double quotes
-        string_format = QTextCharFormat()
-        string_format.setForeground(QColor(string_color))
-        self.highlighting_rules.append((QRegExp(r'"[^"]*"'), string_format))
-        self.highlighting_rules.append((QRegExp(r"'[^']*'"), string_format))
-        
-        # Numbers - integers and floats
-        number_format = QTextCharFormat()
-        number_format.setForeground(QColor(number_color))
-        self.highlighting_rules.append((QRegExp(r'\b\d+\.?\d*\b'), number_format))
-        
-        # Version numbers - v1.2.3, 1.2.3.4, etc.
-        version_format = QTextCharFormat()
-        version_format.setForeground(QColor(version_color))
-        version_format.setFontWeight(QFont.Bold)
-        self.highlighting_rules.append((QRegExp(r'\bv?\d+\.\d+(?:\.\d+)*(?:-[a-zA-Z0-9]+)?\b'), version_format))
-        
-        # IP addresses - IPv4 and IPv6
-        ip_format = QTextCharFormat()
-        ip_format.setForeground(QColor(ip_color))
-        ip_format.setFontWeight(QFont.Bold)
-        # IPv4: 192.168.1.1
-        self.highlighting_rules.append((QRegExp(r'\b(?:\d{1,3}\.){3}\d{1,3}\b'), ip_format))
-        # IPv6: 2001:0db8:85a3:0000:0000:8a2e:0370:7334
-        self.highlighting_rules.append((QRegExp(r'\b(?:[0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}\b'), ip_format))
-        
-        # Hex colors - #FF0000, #fff, etc.
-        hex_color_format = QTextCharFormat()
-        hex_color_format.setForeground(QColor(hex_color))
-        hex_color_format.setFontWeight(QFont.Bold)
-        self.highlighting_rules.append((QRegExp(r'#[0-9a-fA-F]{3,6}\b'), hex_color_format))
-        
-        # Dates and times - various formats
-        date_format = QTextCharFormat()
-        date_format.setForeground(QColor(date_color))
-        # Dates: YYYY-MM-DD, DD/MM/YYYY, MM/DD/YYYY
-        self.highlighting_rules.append((QRegExp(r'\b\d{4}-\d{2}-\d{2}\b'), date_format))
-        self.highlighting_rules.append((QRegExp(r'\b\d{1,2}/\d{1,2}/\d{4}\b'), date_format))
-        # Times: HH:MM:SS, HH:MM
-        self.highlighting_rules.append((QRegExp(r'\b\d{1,2}:\d{2}(?::\d{2})?(?:\s?[AP]M)?\b'), date_format))
-        # ISO datetime: 2024-01-01T12:00:00
-        self.highlighting_rules.append((QRegExp(r'\b\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:\d{2})?\b'), date_format))
-        
-        # URLs - http, https, ftp, file://
-        url_format = QTextCharFormat()
-        url_format.setForeground(QColor(url_color))
-        url_format.setUnderlineStyle(QTextCharFormat.SingleUnderline)
-        self.highlighting_rules.append((QRegExp(r'https?://[^\s<>"\'{}|\\^`\[\]]+'), url_format))
-        self.highlighting_rules.append((QRegExp(r'ftp://[^\s<>"\'{}|\\^`\[\]]+'), url_format))
-        self.highlighting_rules.append((QRegExp(r'file://[^\s<>"\'{}|\\^`\[\]]+'), url_format))
-        
-        # Email addresses
-        email_format = QTextCharFormat()
-        email_format.setForeground(QColor(email_color))
-        email_format.setUnderlineStyle(QTextCharFormat.SingleUnderline)
-        self.highlighting_rules.append((QRegExp(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'), email_format))
-        
-        # File paths - Windows and Unix style
-        path_format = QTextCharFormat()
-        path_format.setForeground(QColor(path_color))
-        # Windows paths: C:\path\to\file or \\server\share
-        self.highlighting_rules.append((QRegExp(r'[A-Za-z]:\\[^\s<>"\'{}|\\^`\[\]]+'), path_format))
-        self.highlighting_rules.append((QRegExp(r'\\\\[^\s<>"\'{}|\\^`\[\]]+'), path_format))
-        # Unix paths: /path/to/file or ~/path/to/file
-        self.highlighting_rules.append((QRegExp(r'/[^\s<>"\'{}|\\^`\[\]]+'), path_format))
-        self.highlighting_rules.append((QRegExp(r'~/[^\s<>"\'{}|\\^`\[\]]+'), path_format))
-        
-        # Boolean values
-        boolean_format = QTextCharFormat()
-        boolean_format.setForeground(QColor(boolean_color))
-        boolean_format.setFontWeight(QFont.Bold)
-        self.highlighting_rules.append((QRegExp(r'\b(true|false|yes|no|on|off|enabled|disabled|active|inactive)\b'), boolean_format))
-        
-        # Operators and special characters
-        operator_format = QTextCharFormat()
-        operator_format.setForeground(QColor(operator_color))
-        # Math operators: +, -, *, /, =, !=, <, >, <=, >=
-        self.highlighting_rules.append((QRegExp(r'[+\-*/=<>!]+'), operator_format))
-        
-        # Brackets and parentheses
-        bracket_format = QTextCharFormat()
-        bracket_format.setForeground(QColor(bracket_color))
-        bracket_format.setFontWeight(QFont.Bold)
-        self.highlighting_rules.append((QRegExp(r'[{}[\]()]'), bracket_format))
-        
-        # Comments - various styles
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(QColor(comment_color))
-        comment_format.setFontItalic(True)
-        # Hash comments (#)
-        self.highlighting_rules.append((QRegExp(r'#.*'), comment_format))
-        # Double slash comments (//)
-        self.highlighting_rules.append((QRegExp(r'//.*'), comment_format))
-        # Semicolon comments (;)
-        self.highlighting_rules.append((QRegExp(r';.*'), comment_format))
+        fmt = _theme_formats(GENERIC_FORMATS, self.theme)
         
         # Common keywords (if they appear in plain text)
-        keyword_format = QTextCharFormat()
-        keyword_format.setForeground(QColor(keyword_color))
-        keyword_format.setFontWeight(QFont.Bold)
+        # (ok, okay, done are covered by the success keywords)
         common_keywords = ['null', 'none', 'warning', 'info', 'debug',
-                          'ok', 'okay', 'done', 'start', 'stop', 'begin', 
+                          'start', 'stop', 'begin', 
                           'end', 'init', 'exit', 'load', 'save', 'open', 
                           'close', 'read', 'write', 'create', 'delete', 
                           'update', 'insert', 'select']
-        for keyword in common_keywords:
-            self.highlighting_rules.append((QRegExp(r'\b' + keyword + r'\b'), keyword_format))
         
         # Error keywords - special color
-        error_format = QTextCharFormat()
-        error_format.setForeground(QColor(error_color))
-        error_format.setFontWeight(QFont.Bold)
         error_keywords = ['error', 'fail', 'failed', 'failure', 'exception', 
                          'crash', 'abort', 'invalid', 'wrong', 'bad']
-        for keyword in error_keywords:
-            self.highlighting_rules.append((QRegExp(r'\b' + keyword + r'\b'), error_format))
         
         # Success keywords - special color
-        success_format = QTextCharFormat()
-        success_format.setForeground(QColor(success_color))
-        success_format.setFontWeight(QFont.Bold)
         success_keywords = ['success', 'pass', 'passed', 'complete', 'completed',
                            'valid', 'good', 'ok', 'okay', 'done', 'finished']
-        for keyword in success_keywords:
-            self.highlighting_rules.append((QRegExp(r'\b' + keyword + r'\b'), success_format))
+        
+        # Boolean values
+        boolean_keywords = ['true', 'false', 'yes', 'no', 'on', 'off',
+                            'enabled', 'disabled', 'active', 'inactive']
+        
+        # Keyword formats by word (later lists take precedence)
+        keywords = dict.fromkeys(boolean_keywords, fmt['boolean'])
+        keywords.update(dict.fromkeys(common_keywords, fmt['keyword']))
+        keywords.update(dict.fromkeys(error_keywords, fmt['error']))
+        keywords.update(dict.fromkeys(success_keywords, fmt['success']))
+        
+        # Characters that end a URL or path
+        path_chars = r'[^\s<>"\'{}|\\^`\[\]]++'
+        
+        # All generic tokens are matched in one pass; the order decides which
+        # token wins where several could start at the same position
+        self.add_scanner(token_scanner([
+            # URLs - http, https, ftp, file://
+            (r'(?:https?|ftp|file)://' + path_chars, fmt['url']),
+            # Email addresses
+            (r'\b[A-Za-z0-9._%+-]++@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', fmt['email']),
+            # ISO datetime: 2024-01-01T12:00:00
+            (r'\b\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:\d{2})?\b', fmt['date']),
+            # Dates: YYYY-MM-DD, DD/MM/YYYY, MM/DD/YYYY
+            (r'\b\d{4}-\d{2}-\d{2}\b', fmt['date']),
+            (r'\b\d{1,2}/\d{1,2}/\d{4}\b', fmt['date']),
+            # Times: HH:MM:SS, HH:MM
+            (r'\b\d{1,2}:\d{2}(?::\d{2})?(?:\s?[AP]M)?\b', fmt['date']),
+            # IP addresses - IPv4: 192.168.1.1
+            (r'\b(?:\d{1,3}\.){3}\d{1,3}\b', fmt['ip']),
+            # IPv6: 2001:0db8:85a3:0000:0000:8a2e:0370:7334
+            (r'\b(?:[0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}\b', fmt['ip']),
+            # Version numbers - v1.2.3, 1.2.3.4, etc.
+            (r'\bv?\d+\.\d+(?:\.\d+)*(?:-[a-zA-Z0-9]+)?\b', fmt['version']),
+            # Numbers - integers and floats
+            (r'\b\d+\.?\d*\b', fmt['number']),
+            # Hex colors - #FF0000, #fff, etc.
+            (r'#[0-9a-fA-F]{3,6}\b', fmt['hex']),
+            # Comments - hash (#), double slash (//) and semicolon (;)
+            (r'#.*', fmt['comment']),
+            (r'//.*', fmt['comment']),
+            (r';.*', fmt['comment']),
+            # Strings - single and double quotes
+            (r'"[^"]*+"', fmt['string']),
+            (r"'[^']*+'", fmt['string']),
+            # Windows paths: C:\path\to\file or \\server\share
+            (r'[A-Za-z]:\\' + path_chars, fmt['path']),
+            (r'\\\\' + path_chars, fmt['path']),
+            # Unix paths: /path/to/file or ~/path/to/file
+            (r'/' + path_chars, fmt['path']),
+            (r'~/' + path_chars, fmt['path']),
+            (IDENTIFIER, keywords),
+            # Math operators: +, -, *, /, =, !=, <, >, <=, >=
+            (r'[+\-*/=<>!]+', fmt['operator']),
+            # Brackets and parentheses
+            (r'[{}[\]()]', fmt['bracket']),
+        ]), None)
     
     def highlightBlock(self, text):
         """Apply highlighting to a block of text"""
-        for pattern, format in self.highlighting_rules:
-            expression = QRegExp(pattern)
-            index = expression.indexIn(text)
-            while index >= 0:
-                length = expression.matchedLength()
-                self.setFormat(index, length, format)
-                index = expression.indexIn(text, index + length)
-
+        if self._setup_pending:
+            return  # Rules not set up yet (see __init__)
+        
+        # Blank blocks have nothing to format; just carry an open span through.
+        # Outside spans the state stays -1 (Qt's initial value), so a first
+        # pass over a block doesn't count as a state change that forces
+        # Qt to go on highlighting the following blocks
+        if not text or text.isspace():
+            if self.span_rules:
+                self.setCurrentBlockState(self.previousBlockState())
+            return
+        
+        # Spans are still tracked over the whole block (see highlight_spans)
+        full_text = text
+        if len(text) > MAX_BLOCK_SCAN:
+            text = text[:MAX_BLOCK_SCAN]
+        
+        # Rules hold ready-made QRegularExpression objects (PCRE2, JIT-compiled
+        # by Qt after first use); matching does not mutate them
+        rules = self.highlighting_rules
+        set_format = self.setFormat
+        # Trigger lookups done for this block (rules share e.g. the digit check)
+        triggered = {}
+        for expression, format, triggers, scan in rules:
+            # Cheap literal prefilter before running the regex engine
+            if triggers is not None:
+                present = triggered.get(triggers)
+                if present is None:
+                    present = triggered[triggers] = triggers(text) is not None
+                if not present:
+                    continue
+            if scan is not None:
+                if format is None:
+                    for start, length, token_format in scan(text):
+                        set_format(start, length, token_format)
+                else:
+                    for start, length in scan(text):
+                        set_format(start, length, format)
+                continue
+            matches = expression.globalMatch(text)
+            while matches.hasNext():
+                match = matches.next()
+                set_format(match.capturedStart(), match.capturedLength(), format)
+        
+        if self.span_rules:
+            self.highlight_spans(full_text)
+    
+    def highlight_spans(self, text):
+        """Format delimited spans and carry an unterminated one into the next block"""
+        spans = self.span_rules
+        self.setCurrentBlockState(-1)
+        state = self.previousBlockState()
+        if state > len(spans):
+            state = -1
+        
+        # Spans are found in code points but formatted in UTF-16 offsets
+        offsets = utf16_offsets(text)
+        if offsets is None:
+            set_format = self.setFormat
+        else:
+            def set_format(start, count, format):
+                self.setFormat(offsets[start], offsets[start + count] - offsets[start], format)
+        
+        # Resume a span left open by the previous block at position 0
+        start = 0
+        search_from = 0
+        length = len(text)
+        while True:
+            if state > 0:
+                end_delim, format = spans[state - 1][1:]
+                end = text.find(end_delim, search_from)
+                if end == -1:
+                    set_format(start, length - start, format)
+                    self.setCurrentBlockState(state)
+                    return
+                end += len(end_delim)
+                set_format(start, end - start, format)
+                search_from = end
+            # Find the earliest opening delimiter after the current position
+            start = -1
+            for index, (start_delim, _, _) in enumerate(spans):
+                found = text.find(start_delim, search_from)
+                if found != -1 and (start == -1 or found < start):
+                    start = found
+                    state = index + 1
+            if start == -1:
+                return
+            search_from = start + len(spans[state - 1][0])
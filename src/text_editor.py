@@ -5,26 +5,93 @@ Text Editor Module
 Main text editor application window
 """
 
-import sys
 import os
 import re
-import json
+import stat
+import io
+import bisect
+import mmap
+import codecs
+import functools
+from array import array
 from pathlib import Path
-from PyQt5.QtWidgets import (QMainWindow, QMenuBar, QMenu, QFileDialog, 
+from PyQt5.QtWidgets import (QMainWindow, QFileDialog, 
                              QMessageBox, QStatusBar, QToolBar, QAction, 
                              QVBoxLayout, QWidget, QPlainTextEdit, QDialog, 
                              QDialogButtonBox, QFormLayout, QSpinBox, QLineEdit,
-                             QCheckBox, QLabel, QHBoxLayout, QPushButton, QFrame,
+                             QLabel, QHBoxLayout, QPushButton, QFrame,
                              QTextEdit, QTextBrowser, QScrollArea, QApplication)
-from PyQt5.QtCore import Qt, QSize, QPoint, QFile, QTextStream
-from PyQt5.QtGui import QKeySequence, QTextCursor, QTextDocument, QFont, QIcon
+from PyQt5.QtCore import (Qt, QSize, QPoint, QThreadPool, QTimer, QSaveFile, QEventLoop,
+                          QRegularExpression)
+from PyQt5.QtGui import QKeySequence, QTextCursor, QFont, QIcon
 
 from .code_editor import CodeEditor
 from .syntax_highlighter import SyntaxHighlighter
-from .formatters import Formatters
+from .search_worker import SearchWorker
 from .themes import ThemeManager
 from .utils import detect_language, detect_file_type_from_content
 
+# Bytes decoded and inserted per step when loading a file
+LOAD_CHUNK_SIZE = 1024 * 1024
+# Process pending UI events after this many loaded chunks
+LOAD_EVENTS_EVERY = 4
+# Longest time (ms) spent processing UI events per step while loading
+LOAD_EVENTS_MAX_TIME = 10
+# Characters encoded and written per step when saving a file
+SAVE_CHUNK_SIZE = 1024 * 1024
+
+# Delay (ms) after the last keystroke in the find box before counting matches
+SEARCH_DELAY = 120
+# Documents at least this long (characters) are searched on a worker thread
+BACKGROUND_SEARCH_SIZE = 1024 * 1024
+
+# First non-whitespace character of a document (Unicode whitespace, as str.strip)
+FIRST_NONSPACE = QRegularExpression(r'\S', QRegularExpression.UseUnicodePropertiesOption)
+
+# Characters toPlainText() replaces: block/line separators and non-breaking space
+PLAIN_TEXT_MAP = {0x2029: '\n', 0x2028: '\n', 0xFDD0: '\n', 0xFDD1: '\n', 0xA0: ' '}
+
+# Menu entries as (label, shortcut, slot attribute path); None is a separator
+FILE_MENU_ACTIONS = [
+    ('New', QKeySequence.New, 'new_file'),
+    ('Open', QKeySequence.Open, 'open_file'),
+    ('Save', QKeySequence.Save, 'save_file'),
+    ('Save As...', QKeySequence.SaveAs, 'save_as_file'),
+    None,
+    ('Exit', QKeySequence.Quit, 'close'),
+]
+EDIT_MENU_ACTIONS = [
+    ('Find...', QKeySequence.Find, 'show_find_dialog'),
+    ('Find Next', "F3", 'find_next'),
+    None,
+    ('Auto-Formatting', "Ctrl+Shift+F", 'auto_format'),
+    None,
+    ('Undo', QKeySequence.Undo, 'text_edit.undo'),
+    ('Redo', QKeySequence.Redo, 'text_edit.redo'),
+    None,
+    ('Cut', QKeySequence.Cut, 'text_edit.cut'),
+    ('Copy', QKeySequence.Copy, 'text_edit.copy'),
+    ('Paste', QKeySequence.Paste, 'text_edit.paste'),
+    ('Select All', QKeySequence.SelectAll, 'text_edit.selectAll'),
+]
+
+
+@functools.lru_cache(maxsize=None)
+def window_icon():
+    """Load the application icon once (None if logo.png is missing)"""
+    icon_path = Path(__file__).parent / "logo.png"
+    if icon_path.exists():
+        return QIcon(str(icon_path))
+    return None
+
+
+@functools.lru_cache(maxsize=64)
+def search_patterns(text):
+    """Compile the case-insensitive find patterns for text: (match, overlapping lookahead)"""
+    escaped = re.escape(text)
+    return (re.compile(escaped, re.IGNORECASE),
+            re.compile('(?=%s)' % escaped, re.IGNORECASE))
+
 
 class TextEditor(QMainWindow):
     """Main text editor window"""
@@ -35,6 +102,12 @@ class TextEditor(QMainWindow):
         self.highlighter = None
         self.current_theme = 'dark'  # Default theme
         self.find_bar = None  # Find bar widget
+        self.format_actions = []  # Menu/toolbar actions disabled while formatting
+        self.format_worker = None  # Running background format job
+        self.format_revision = None  # Document revision the job was started on
+        self.formatted_state = None  # (document revision, language) known to be formatted
+        self.detected_language = None  # (document revision, content-detected language)
+        self.plain_text_cache = (None, '')  # (document revision, document text)
         self.init_ui()
         ThemeManager.apply_theme(self, 'dark')
     
@@ -43,9 +116,9 @@ class TextEditor(QMainWindow):
         self.setWindowTitle("SmartPad")
         
         # Set window icon
-        icon_path = Path(__file__).parent / "logo.png"
-        if icon_path.exists():
-            self.setWindowIcon(QIcon(str(icon_path)))
+        icon = window_icon()
+        if icon is not None:
+            self.setWindowIcon(icon)
         
         # Get screen geometry for responsive sizing
         screen = self.screen().availableGeometry()
@@ -59,6 +132,12 @@ class TextEditor(QMainWindow):
         
         self.setGeometry(x, y, width, height)
         
+        # Device pixel ratio, queried once for all DPI-scaled sizes
+        try:
+            self.dpi_scale = max(1.0, self.devicePixelRatioF())
+        except:
+            self.dpi_scale = 1.0
+        
         # Create central widget and layout
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -84,96 +163,27 @@ class TextEditor(QMainWindow):
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Ready")
         
-        # Connect text change signal
-        self.text_edit.textChanged.connect(self.on_text_changed)
+        # Status bar updates are coalesced: one refresh after a burst of edits
+        self.status_timer = QTimer(self)
+        self.status_timer.setSingleShot(True)
+        self.status_timer.setInterval(50)
+        self.status_timer.timeout.connect(self.update_status)
+        
+        # Connect text change signal (contentsChange rather than textChanged,
+        # which also fires for every block the highlighter formats)
+        self.text_edit.document().contentsChange.connect(self.on_text_changed)
     
     def create_menu_bar(self):
         """Create menu bar with actions"""
         menubar = self.menuBar()
         
-        # File menu
+        # File and Edit menus
         file_menu = menubar.addMenu('File')
+        self.add_menu_actions(file_menu, FILE_MENU_ACTIONS)
         
-        new_action = QAction('New', self)
-        new_action.setShortcut(QKeySequence.New)
-        new_action.triggered.connect(self.new_file)
-        file_menu.addAction(new_action)
-        
-        open_action = QAction('Open', self)
-        open_action.setShortcut(QKeySequence.Open)
-        open_action.triggered.connect(self.open_file)
-        file_menu.addAction(open_action)
-        
-        save_action = QAction('Save', self)
-        save_action.setShortcut(QKeySequence.Save)
-        save_action.triggered.connect(self.save_file)
-        file_menu.addAction(save_action)
-        
-        save_as_action = QAction('Save As...', self)
-        save_as_action.setShortcut(QKeySequence.SaveAs)
-        save_as_action.triggered.connect(self.save_as_file)
-        file_menu.addAction(save_as_action)
-        
-        file_menu.addSeparator()
-        
-        exit_action = QAction('Exit', self)
-        exit_action.setShortcut(QKeySequence.Quit)
-        exit_action.triggered.connect(self.close)
-        file_menu.addAction(exit_action)
-        
-        # Edit menu
         edit_menu = menubar.addMenu('Edit')
-        
-        find_action = QAction('Find...', self)
-        find_action.setShortcut(QKeySequence.Find)
-        find_action.triggered.connect(self.show_find_dialog)
-        edit_menu.addAction(find_action)
-        
-        find_next_action = QAction('Find Next', self)
-        find_next_action.setShortcut(QKeySequence("F3"))
-        find_next_action.triggered.connect(self.find_next)
-        edit_menu.addAction(find_next_action)
-        
-        edit_menu.addSeparator()
-        
-        format_action = QAction('Auto-Formatting', self)
-        format_action.setShortcut(QKeySequence("Ctrl+Shift+F"))
-        format_action.triggered.connect(self.auto_format)
-        edit_menu.addAction(format_action)
-        
-        edit_menu.addSeparator()
-        
-        undo_action = QAction('Undo', self)
-        undo_action.setShortcut(QKeySequence.Undo)
-        undo_action.triggered.connect(self.text_edit.undo)
-        edit_menu.addAction(undo_action)
-        
-        redo_action = QAction('Redo', self)
-        redo_action.setShortcut(QKeySequence.Redo)
-        redo_action.triggered.connect(self.text_edit.redo)
-        edit_menu.addAction(redo_action)
-        
-        edit_menu.addSeparator()
-        
-        cut_action = QAction('Cut', self)
-        cut_action.setShortcut(QKeySequence.Cut)
-        cut_action.triggered.connect(self.text_edit.cut)
-        edit_menu.addAction(cut_action)
-        
-        copy_action = QAction('Copy', self)
-        copy_action.setShortcut(QKeySequence.Copy)
-        copy_action.triggered.connect(self.text_edit.copy)
-        edit_menu.addAction(copy_action)
-        
-        paste_action = QAction('Paste', self)
-        paste_action.setShortcut(QKeySequence.Paste)
-        paste_action.triggered.connect(self.text_edit.paste)
-        edit_menu.addAction(paste_action)
-        
-        select_all_action = QAction('Select All', self)
-        select_all_action.setShortcut(QKeySequence.SelectAll)
-        select_all_action.triggered.connect(self.text_edit.selectAll)
-        edit_menu.addAction(select_all_action)
+        actions = self.add_menu_actions(edit_menu, EDIT_MENU_ACTIONS)
+        self.format_actions.append(actions['Auto-Formatting'])
         
         edit_menu.addSeparator()
         
@@ -214,23 +224,38 @@ class TextEditor(QMainWindow):
         help_action.triggered.connect(self.show_help)
         menubar.addAction(help_action)
     
+    def add_menu_actions(self, menu, spec):
+        """Add actions described by (label, shortcut, slot) entries to menu; None adds a separator"""
+        actions = {}
+        for entry in spec:
+            if entry is None:
+                menu.addSeparator()
+                continue
+            label, shortcut, slot = entry
+            # slot is an attribute path from the editor window, e.g. 'text_edit.undo'
+            target = self
+            for name in slot.split('.'):
+                target = getattr(target, name)
+            action = QAction(label, self)
+            action.setShortcut(QKeySequence(shortcut))
+            action.triggered.connect(target)
+            menu.addAction(action)
+            actions[label] = action
+        return actions
+    
     def create_toolbar(self):
         """Create toolbar with common actions"""
         toolbar = QToolBar()
         toolbar.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)  # Show text beside icon
         
         # Icon size scales with DPI - smaller size
-        try:
-            dpi_scale = self.devicePixelRatioF()
-        except:
-            dpi_scale = 1.0
         # Base icon size: 18 (reduced from 20)
         base_icon_size = 18
-        icon_size = int(base_icon_size * max(1.0, dpi_scale))
+        icon_size = int(base_icon_size * self.dpi_scale)
         toolbar.setIconSize(QSize(icon_size, icon_size))
         
         # Set toolbar button size - smaller height
-        toolbar.setMinimumHeight(int(30 * max(1.0, dpi_scale)))
+        toolbar.setMinimumHeight(int(30 * self.dpi_scale))
         
         self.addToolBar(toolbar)
         
@@ -252,6 +277,7 @@ class TextEditor(QMainWindow):
         format_action.setShortcut(QKeySequence("Ctrl+Shift+F"))
         format_action.triggered.connect(self.auto_format)
         toolbar.addAction(format_action)
+        self.format_actions.append(format_action)
     
     def change_theme(self, theme):
         """Change application theme"""
@@ -262,7 +288,7 @@ class TextEditor(QMainWindow):
             self.text_edit.set_theme(theme)
         # Update syntax highlighter colors if needed
         if self.highlighter:
-            self.highlighter.set_theme(theme)
+            self.highlighter.set_theme(theme, self.text_edit.firstVisibleBlock().blockNumber())
         # Update find bar theme
         if hasattr(self, 'find_bar') and self.find_bar:
             self.find_bar.apply_theme()
@@ -315,8 +341,7 @@ class TextEditor(QMainWindow):
         """Update syntax highlighting based on language or content"""
         # If language is generic, try to detect from content
         if language == 'generic':
-            content = self.text_edit.toPlainText()
-            detected = detect_file_type_from_content(content)
+            detected = self.detect_content_language()
             if detected:
                 language = detected
         
@@ -326,15 +351,45 @@ class TextEditor(QMainWindow):
         self.highlighter = SyntaxHighlighter(
             self.text_edit.document(), 
             language, 
-            self.current_theme
+            self.current_theme,
+            self.text_edit.firstVisibleBlock().blockNumber()
         )
         self.status_bar.showMessage(f"Language: {language.upper()}")
     
+    def plain_text(self):
+        """Get the document text, reusing the last copy while the document is unchanged"""
+        revision = self.text_edit.document().revision()
+        if self.plain_text_cache[0] != revision:
+            self.plain_text_cache = (revision, self.text_edit.toPlainText())
+        return self.plain_text_cache[1]
+    
+    def text_range(self, start, end):
+        """Get the document text between two positions, as toPlainText() would return it"""
+        cursor = QTextCursor(self.text_edit.document())
+        cursor.setPosition(start)
+        cursor.setPosition(end, QTextCursor.KeepAnchor)
+        return cursor.selectedText().translate(PLAIN_TEXT_MAP)
+    
+    def content_sample(self, limit=10000):
+        """Get the first limit characters of the document without copying all of it"""
+        # Same translation as plain_text(), so detection sees identical text
+        return self.text_range(0, min(limit, self.text_edit.document().characterCount() - 1))
+    
+    def detect_content_language(self):
+        """Detect the language from a sample of the content (cached per document revision)"""
+        revision = self.text_edit.document().revision()
+        if self.detected_language is not None and self.detected_language[0] == revision:
+            return self.detected_language[1]
+        detected = detect_file_type_from_content(self.content_sample())
+        self.detected_language = (revision, detected)
+        return detected
+    
     def new_file(self):
         """Create a new file"""
         if self.maybe_save():
             self.text_edit.clear()
             self.text_edit.document().setModified(False)  # Mark as unmodified
+            self.status_timer.stop()  # Keep the message below visible
             self.current_file = None
             self.setWindowTitle("SmartPad - Untitled")
             if self.highlighter:
@@ -351,18 +406,24 @@ class TextEditor(QMainWindow):
             if filename:
                 self.open_file_from_path(filename)
     
+    def yield_to_ui(self):
+        """Let pending paint/timer events run for a bounded time, without user input"""
+        QApplication.processEvents(QEventLoop.ExcludeUserInputEvents, LOAD_EVENTS_MAX_TIME)
+    
     def open_file_from_path(self, filepath):
         """Open a file from a given file path (used for command-line arguments and 'Open with')"""
         if not filepath:
             return False
         
-        # Check if file exists
-        if not os.path.exists(filepath):
+        # Check if file exists (one stat call answers all the checks below)
+        try:
+            file_stat = os.stat(filepath)
+        except (OSError, ValueError):
             QMessageBox.critical(self, "Error", f"File not found:\n{filepath}")
             return False
         
         # Check if it's a file (not a directory)
-        if not os.path.isfile(filepath):
+        if not stat.S_ISREG(file_stat.st_mode):
             QMessageBox.critical(self, "Error", f"Path is not a file:\n{filepath}")
             return False
         
@@ -372,46 +433,73 @@ class TextEditor(QMainWindow):
         
         try:
             # Get file size to determine loading strategy
-            file_size = os.path.getsize(filepath)
+            file_size = file_stat.st_size
             file_size_mb = file_size / (1024 * 1024)  # Size in MB
             is_large_file = file_size > 500 * 1024  # 500 KB (approximately 500k characters)
             
             # Show loading message for large files
             if is_large_file:
                 self.status_bar.showMessage(f"Loading large file ({file_size_mb:.2f} MB)... Please wait")
-                QApplication.processEvents()  # Allow UI to update
+                self.yield_to_ui()  # Allow UI to update
             
-            # Read file content - use QTextStream for better performance with large files
-            qt_file = QFile(filepath)
-            if not qt_file.open(QFile.ReadOnly | QFile.Text):
-                raise IOError(f"Could not open file: {filepath}")
+            # Stream the file into the document chunk by chunk instead of
+            # building the whole content as one string first. The file is
+            # memory-mapped, so pages are read in on demand as chunks are decoded
+            with open(filepath, 'rb') as raw_file:
+                mapped = mmap.mmap(raw_file.fileno(), 0, access=mmap.ACCESS_READ) if file_size else None
+            # UTF-8 (BOM skipped, invalid bytes replaced) with \r\n and \r as \n
+            decoder = io.IncrementalNewlineDecoder(
+                codecs.getincrementaldecoder('utf-8-sig')(errors='replace'), translate=True
+            )
             
-            stream = QTextStream(qt_file)
-            stream.setCodec('UTF-8')
-            content = stream.readAll()
-            qt_file.close()
+            # Drop the old highlighter so it doesn't re-highlight while loading
+            if self.highlighter:
+                self.highlighter.setDocument(None)
+                self.highlighter = None
             
-            # Allow UI to update after reading
-            QApplication.processEvents()
+            document = self.text_edit.document()
+            self.text_edit.clear()
+            self.text_edit.setUndoRedoEnabled(False)
+            self.text_edit.setReadOnly(True)  # No typing into a half-loaded file
+            cursor = QTextCursor(document)
+            cursor.beginEditBlock()
+            char_count = 0
+            chunks = 0
+            try:
+                if mapped is not None:
+                    with memoryview(mapped) as view:
+                        for offset in range(0, len(view), LOAD_CHUNK_SIZE):
+                            chunk = decoder.decode(view[offset:offset + LOAD_CHUNK_SIZE])
+                            cursor.insertText(chunk)
+                            char_count += len(chunk)
+                            chunks += 1
+                            if is_large_file and chunks % LOAD_EVENTS_EVERY == 0:
+                                self.status_bar.showMessage(f"Loading... {char_count:,} characters")
+                                self.yield_to_ui()  # Allow UI to update
+                # Flush a trailing \r or incomplete character
+                chunk = decoder.decode(b'', final=True)
+                cursor.insertText(chunk)
+                char_count += len(chunk)
+            finally:
+                cursor.endEditBlock()
+                if mapped is not None:
+                    mapped.close()
+                self.text_edit.setReadOnly(False)
+                self.text_edit.setUndoRedoEnabled(True)
             
             self.current_file = filepath
             self.setWindowTitle(f"SmartPad - {Path(filepath).name}")
+            self.text_edit.moveCursor(QTextCursor.Start)
+            document.setModified(False)  # Mark as unmodified
+            # The pending line/column update would replace the "Opened" message
+            self.status_timer.stop()
             
             # For very large files, disable syntax highlighting to prevent freezing
             # Threshold: 500k characters (approximately)
-            char_count = len(content)
             should_highlight = char_count < 500000  # Disable highlighting for files > 500k chars
             
-            if is_large_file:
-                self.status_bar.showMessage(f"Setting content ({char_count:,} characters)...")
-                QApplication.processEvents()
-            
-            # Set content
-            self.text_edit.setPlainText(content)
-            self.text_edit.document().setModified(False)  # Mark as unmodified
-            
             # Allow UI to update after setting text
-            QApplication.processEvents()
+            self.yield_to_ui()
             
             # Detect language from extension first, then from content (only sample for large files)
             language = detect_language(filepath)
@@ -420,14 +508,18 @@ class TextEditor(QMainWindow):
             if should_highlight:
                 # If generic, try to detect from content (use sample for large files)
                 if language == 'generic':
-                    # For large files, only check first 10000 characters for detection
-                    sample = content[:10000] if len(content) > 10000 else content
-                    detected = detect_file_type_from_content(sample)
+                    # Only the first 10000 characters are checked for detection
+                    detected = self.detect_content_language()
                     if detected:
                         language = detected
                 
-                self.update_syntax_highlighting(language)
-                self.status_bar.showMessage(f"Opened: {filepath} ({language.upper()}, {char_count:,} chars)")
+                # Highlight on the next event loop tick so the loaded text
+                # is painted before the first highlighting pass runs
+                message = f"Opened: {filepath} ({language.upper()}, {char_count:,} chars)"
+                self.status_bar.showMessage(message)
+                QTimer.singleShot(
+                    0, lambda: self.highlight_opened_file(filepath, language, message)
+                )
             else:
                 # Disable syntax highlighting for very large files
                 if self.highlighter:
@@ -436,8 +528,7 @@ class TextEditor(QMainWindow):
                 
                 # Still detect language for display, but don't highlight
                 if language == 'generic':
-                    sample = content[:10000] if len(content) > 10000 else content
-                    detected = detect_file_type_from_content(sample)
+                    detected = self.detect_content_language()
                     if detected:
                         language = detected
                 
@@ -452,13 +543,23 @@ class TextEditor(QMainWindow):
             QMessageBox.critical(self, "Error", f"Could not open file:\n{str(e)}")
             return False
     
+    def highlight_opened_file(self, filepath, language, message):
+        """Attach the highlighter for a just-opened file (skipped if another file was opened)"""
+        if self.current_file != filepath or self.highlighter is not None:
+            return
+        self.update_syntax_highlighting(language)
+        self.status_bar.showMessage(message)
+    
     def save_file(self):
         """Save current file - overwrites existing file if it exists"""
+        if self.current_file and not self.text_edit.document().isModified():
+            # Nothing changed since the last open/save; skip rewriting the file
+            self.status_bar.showMessage(f"No changes to save: {self.current_file}")
+            return True
         if self.current_file:
             # File already exists, save directly (overwrite)
             try:
-                with open(self.current_file, 'w', encoding='utf-8') as f:
-                    f.write(self.text_edit.toPlainText())
+                self.write_document(self.current_file)
                 self.text_edit.document().setModified(False)
                 self.status_bar.showMessage(f"Saved: {self.current_file}")
                 return True
@@ -481,8 +582,7 @@ class TextEditor(QMainWindow):
         )
         if filename:
             try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(self.text_edit.toPlainText())
+                self.write_document(filename)
                 self.current_file = filename
                 self.text_edit.document().setModified(False)
                 self.setWindowTitle(f"SmartPad - {Path(filename).name}")
@@ -498,6 +598,41 @@ class TextEditor(QMainWindow):
                 return False
         return False
     
+    def write_document(self, filename):
+        """Write the document to filename as UTF-8, block by block, replacing it atomically"""
+        save_file = QSaveFile(filename)
+        if not save_file.open(QSaveFile.WriteOnly):
+            raise OSError(save_file.errorString())
+        try:
+            # Join and encode a bounded batch of lines at a time instead of
+            # copying the whole document with toPlainText()
+            parts = []
+            size = 0
+            block = self.text_edit.document().begin()
+            while block.isValid():
+                text = block.text()
+                parts.append(text)
+                size += len(text) + 1
+                block = block.next()
+                if size >= SAVE_CHUNK_SIZE and block.isValid():
+                    parts.append('')
+                    self._write_chunk(save_file, parts)
+                    parts = []
+                    size = 0
+            self._write_chunk(save_file, parts)
+        except Exception:
+            save_file.cancelWriting()
+            save_file.commit()
+            raise
+        if not save_file.commit():
+            raise OSError(save_file.errorString())
+    
+    def _write_chunk(self, save_file, lines):
+        """Encode lines joined by the platform line separator and write them"""
+        data = os.linesep.join(lines).encode('utf-8')
+        if save_file.write(data) != len(data):
+            raise OSError(save_file.errorString())
+    
     def maybe_save(self):
         """Check if file needs saving before closing"""
         if self.text_edit.document().isModified():
@@ -514,10 +649,17 @@ class TextEditor(QMainWindow):
     
     def auto_format(self):
         """Auto-detect file type and format accordingly"""
-        content = self.text_edit.toPlainText()
-        if not content.strip():
+        # Imported on first use: the formatters pull in their parser backends
+        from .format_worker import FormatWorker, FORMATTERS
+        
+        # The first non-whitespace character decides the format (however much
+        # whitespace comes first); the full text is only copied once a
+        # formatter has been chosen
+        first = self.text_edit.document().find(FIRST_NONSPACE)
+        if first.isNull():
             QMessageBox.warning(self, "Warning", "No content to format")
             return
+        first_char = first.selectedText()
         
         # Try to detect from file extension first
         language = None
@@ -526,74 +668,99 @@ class TextEditor(QMainWindow):
         
         # Try to detect from content if no file
         if not language:
-            detected = detect_file_type_from_content(content)
-            if detected:
-                language = detected
+            language = self.detect_content_language()
+        
+        # Unknown type: XML starts with <, JSON with { or [
+        if language not in FORMATTERS:
+            if first_char == '<':
+                language = 'xml'
+            elif first_char in ('{', '['):
+                language = 'json'
+            else:
+                self.show_unknown_format_info()
+                return
         
-        # Format based on language
-        formatted = None
-        error = None
-        
-        if language == 'xml' or language == 'html':
-            formatted, error = Formatters.format_xml(content)
-        elif language == 'json':
-            formatted, error = Formatters.format_json(content)
-        elif language == 'python':
-            formatted, error = Formatters.format_python(content)
-        elif language == 'css':
-            formatted, error = Formatters.format_css(content)
-        elif language == 'javascript':
-            formatted, error = Formatters.format_javascript(content)
-        else:
-            # Try XML first (most common), then JSON
-            if '<' in content and '>' in content:
-                formatted, error = Formatters.format_xml(content)
-                if formatted:
-                    self.text_edit.setPlainText(formatted)
-                    self.status_bar.showMessage("XML formatted successfully")
-                    return
-            
-            # Try JSON
-            if '{' in content or '[' in content:
-                formatted, error = Formatters.format_json(content)
-                if formatted:
-                    self.text_edit.setPlainText(formatted)
-                    self.status_bar.showMessage("JSON formatted successfully")
-                    return
-            
-            QMessageBox.information(
-                self, "Info",
-                "Could not auto-detect file format.\n\n"
-                "Supported formats:\n"
-                "- XML/HTML (starts with <?xml or <tag)\n"
-                "- JSON (starts with { or [)\n"
-                "- Python (.py files)\n"
-                "- CSS (.css files)\n"
-                "- JavaScript (.js files)\n\n"
-                "Please ensure your file has the correct format or extension."
-            )
+        # Formatted (or found formatted) and not edited since: nothing to do
+        revision = self.text_edit.document().revision()
+        if self.formatted_state == (revision, language):
+            self.status_bar.showMessage(f"{language.upper()} is already formatted")
+            return
+        content = self.plain_text()
+        
+        # Format on a background thread so large documents don't freeze the UI
+        self.format_revision = revision
+        self.format_worker = FormatWorker(language, content)
+        self.format_worker.signals.finished.connect(self.on_format_finished)
+        for action in self.format_actions:
+            action.setEnabled(False)
+        self.status_bar.showMessage("Formatting...")
+        QThreadPool.globalInstance().start(self.format_worker)
+    
+    def on_format_finished(self, language, formatted, error):
+        """Apply the result of a background format job"""
+        self.format_worker = None
+        for action in self.format_actions:
+            action.setEnabled(True)
+        
+        # Discard the result if the document was edited while formatting
+        if self.text_edit.document().revision() != self.format_revision:
+            self.status_bar.showMessage("Formatting discarded: document changed")
+            return
+        
+        if language is None:
+            self.show_unknown_format_info()
             return
         
-        # Apply formatting
-        if formatted:
-            self.text_edit.setPlainText(formatted)
+        # Apply formatting as a single undoable edit
+        if formatted == self.plain_text():
+            # Already formatted: skip rewriting the document and undo stack
+            self.status_bar.showMessage(f"{language.upper()} is already formatted")
+            self.formatted_state = (self.format_revision, language)
+        elif formatted:
+            cursor = self.text_edit.textCursor()
+            cursor.beginEditBlock()
+            cursor.select(QTextCursor.Document)
+            cursor.insertText(formatted)
+            cursor.endEditBlock()
+            self.status_timer.stop()  # Keep the message below visible
+            self.formatted_state = (self.text_edit.document().revision(), language)
             self.status_bar.showMessage(f"{language.upper()} formatted successfully")
         elif error:
+            self.status_bar.showMessage("Ready")
             QMessageBox.critical(
                 self, "Error", 
                 f"Could not format {language.upper()}:\n{error}\n\n"
                 "Make sure the content is valid."
             )
     
-    def on_text_changed(self):
+    def show_unknown_format_info(self):
+        """Tell the user the content format could not be detected"""
+        self.status_bar.showMessage("Ready")
+        QMessageBox.information(
+            self, "Info",
+            "Could not auto-detect file format.\n\n"
+            "Supported formats:\n"
+            "- XML/HTML (starts with <?xml or <tag)\n"
+            "- JSON (starts with { or [)\n"
+            "- Python (.py files)\n"
+            "- CSS (.css files)\n"
+            "- JavaScript (.js files)\n\n"
+            "Please ensure your file has the correct format or extension."
+        )
+    
+    def on_text_changed(self, position, removed, added):
         """Handle text change events"""
-        self.text_edit.document().setModified(True)
-        # Update status bar with line/column info
+        self.status_timer.start()
+    
+    def update_status(self):
+        """Update status bar with line/column info"""
+        document = self.text_edit.document()
         cursor = self.text_edit.textCursor()
         line = cursor.blockNumber() + 1
         col = cursor.columnNumber() + 1
-        total_lines = self.text_edit.blockCount()
-        total_chars = len(self.text_edit.toPlainText())
+        total_lines = document.blockCount()
+        # characterCount() includes the final paragraph separator
+        total_chars = document.characterCount() - 1
         self.status_bar.showMessage(
             f"Line {line}/{total_lines}, Column {col} | Characters: {total_chars}"
         )
@@ -617,7 +784,6 @@ class TextEditor(QMainWindow):
             # Set focus immediately and ensure it works
             self.find_bar.find_edit.setFocus()
             # Use QTimer as backup to ensure focus is set
-            from PyQt5.QtCore import QTimer
             QTimer.singleShot(50, lambda: (
                 self.find_bar.find_edit.setFocus(),
                 self.find_bar.find_edit.setCursorPosition(0)
@@ -659,7 +825,6 @@ class TextEditor(QMainWindow):
         help_dialog = HelpDialog(self)
         help_dialog.show()
         # Update title bar theme after showing
-        from .themes import ThemeManager
         ThemeManager.update_title_bar_theme(help_dialog, 'dark')
         help_dialog.exec_()
     
@@ -683,6 +848,8 @@ class FindBar(QFrame):
         self.setMinimumWidth(350)
         self.init_ui()
         self.apply_theme()
+        # Keep match positions current while the document is edited
+        parent.text_edit.document().contentsChange.connect(self.on_contents_change)
     
     def init_ui(self):
         """Initialize find bar UI"""
@@ -708,7 +875,26 @@ class FindBar(QFrame):
         self.current_match_index = 0
         self.total_matches = 0
         self.search_text = ""
-        self.match_positions = []
+        # Sorted match offsets, packed as 64-bit ints (documents can hold millions)
+        self.match_positions = array('q')
+        # Document revision the candidate positions were found in
+        self.content_revision = None
+        # Start of every (possibly overlapping) match of candidate_text in the
+        # snapshot; narrowed instead of rescanned as the search text grows
+        self.candidate_text = ""
+        self.candidate_positions = array('q')
+        
+        # Count matches once typing in the find box pauses
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY)
+        self.search_timer.timeout.connect(self.count_matches)
+        
+        # Background count in flight: its request number, search text and revision
+        self.count_generation = 0
+        self.count_worker = None
+        self.count_text = ""
+        self.count_revision = None
     
     def apply_theme(self):
         """Apply theme to find bar"""
@@ -765,45 +951,66 @@ class FindBar(QFrame):
     
     def on_text_changed(self):
         """Handle text change in find box"""
-        # Reset search state when text changes
         new_search_text = self.find_edit.text()
         
         # Only reset if text actually changed
         if new_search_text != self.search_text:
             self.current_match_index = 0
-            self.total_matches = 0
-            self.match_positions = []
             self.search_text = new_search_text
             
-            # Count total matches
+            # Count total matches (after a short pause while typing)
             if self.search_text:
-                self.count_matches()
+                self.search_timer.start()
             else:
+                self.search_timer.stop()
+                self.count_generation += 1  # Drop any background count in flight
+                self.count_worker = None
+                self.total_matches = 0
+                self.match_positions = array('q')
+                self.content_revision = None
                 self.find_label.setText("Find:")
     
-    def count_matches(self):
-        """Count total matches in document"""
+    def count_matches(self, background=True):
+        """Count total matches in document (large documents on a worker thread if background)"""
+        # Any result still pending from an earlier count is now out of date
+        self.count_generation += 1
+        self.count_worker = None
         try:
             text_edit = self.parent_editor.text_edit
             if not text_edit:
                 return
             
-            content = text_edit.toPlainText()
+            revision = text_edit.document().revision()
+            if revision != self.content_revision:
+                self.content_revision = revision
+                self.candidate_text = ""
+            content = self.parent_editor.plain_text()
             if not content or not self.search_text:
+                self.candidate_text = self.search_text
+                self.candidate_positions = array('q')
                 self.total_matches = 0
-                self.match_positions = []
+                self.match_positions = array('q')
                 self.find_label.setText("Find:")
                 return
             
             # Count all matches (case-insensitive by default)
-            import re
-            pattern = re.escape(self.search_text)
-            
-            self.match_positions = []
-            for match in re.finditer(pattern, content, re.IGNORECASE):
-                self.match_positions.append(match.start())
-            
-            self.total_matches = len(self.match_positions)
+            pattern, lookahead = search_patterns(self.search_text)
+            if self.candidate_text and self.search_text.startswith(self.candidate_text):
+                # Typing extends the search: every match starts at a match
+                # of the shorter text, so only those positions are checked
+                match = pattern.match
+                self.candidate_positions = array('q', (
+                    pos for pos in self.candidate_positions if match(content, pos)
+                ))
+            elif background and len(content) >= BACKGROUND_SEARCH_SIZE:
+                self.start_background_count(lookahead, content, revision)
+                return
+            else:
+                self.candidate_positions = array(
+                    'q', (match.start() for match in lookahead.finditer(content))
+                )
+            self.candidate_text = self.search_text
+            self.select_matches()
             
             # Update label
             if self.total_matches > 0:
@@ -814,11 +1021,123 @@ class FindBar(QFrame):
         except Exception:
             self.find_label.setText("Find:")
     
+    def start_background_count(self, lookahead, content, revision):
+        """Collect the match positions on a worker thread; on_count_finished applies them"""
+        # Edits aren't tracked until the result arrives (find_next counts
+        # synchronously in the meantime)
+        self.candidate_text = ""
+        self.content_revision = None
+        self.count_text = self.search_text
+        self.count_revision = revision
+        self.count_worker = SearchWorker(self.count_generation, lookahead, content)
+        self.count_worker.signals.finished.connect(self.on_count_finished)
+        self.find_label.setText("Find: ...")
+        QThreadPool.globalInstance().start(self.count_worker)
+    
+    def on_count_finished(self, generation, positions):
+        """Apply the result of a background count"""
+        if generation != self.count_generation:
+            return  # Superseded by a later count
+        self.count_worker = None
+        if self.parent_editor.text_edit.document().revision() != self.count_revision:
+            # Edited while counting: count again
+            self.search_timer.start()
+            return
+        
+        self.content_revision = self.count_revision
+        self.candidate_text = self.count_text
+        self.candidate_positions = positions
+        self.select_matches()
+        
+        # Update label (find_next may have selected a match meanwhile)
+        if self.total_matches > 0:
+            cursor = self.parent_editor.text_edit.textCursor()
+            index = bisect.bisect_left(self.match_positions, cursor.selectionStart())
+            if (cursor.hasSelection() and index < self.total_matches
+                    and self.match_positions[index] == cursor.selectionStart()):
+                self.current_match_index = index + 1
+            else:
+                self.current_match_index = 1
+            self.find_label.setText(f"{self.current_match_index}/{self.total_matches}")
+        else:
+            self.find_label.setText("Find: (0)")
+    
+    def select_matches(self):
+        """Derive the non-overlapping matches (leftmost first) from the candidate positions"""
+        length = len(self.candidate_text)
+        self.match_positions = array('q')
+        end = 0
+        for pos in self.candidate_positions:
+            if pos >= end:
+                self.match_positions.append(pos)
+                end = pos + length
+        self.total_matches = len(self.match_positions)
+    
+    def on_contents_change(self, position, removed, added):
+        """Update matches for an edit by re-scanning only the text around it"""
+        if self.content_revision is None:
+            return  # Nothing counted yet
+        if not self.isVisible() or not self.candidate_text:
+            # Not tracking edits; count again when the search is next used
+            self.content_revision = None
+            return
+        
+        # Candidates ending before the edit are kept, those starting after
+        # the removed text are shifted, the ones in between are dropped.
+        # They belong to candidate_text (search_text may be awaiting a count)
+        length = len(self.candidate_text)
+        edit_end = position + removed
+        shift = added - removed
+        candidates = self.candidate_positions
+        keep = bisect.bisect_right(candidates, position - length)
+        tail = bisect.bisect_left(candidates, edit_end)
+        
+        # Re-scan the window where a match could touch the inserted text
+        document = self.parent_editor.text_edit.document()
+        start = max(0, position - length + 1)
+        end = min(position + added + length - 1, document.characterCount() - 1)
+        window = self.parent_editor.text_range(start, end)
+        _, lookahead = search_patterns(self.candidate_text)
+        found = array('q', (start + match.start() for match in lookahead.finditer(window)))
+        
+        # Matches before the edit are unchanged; pick the rest greedily until
+        # the selection meets an old match, after which it is the old chain shifted
+        old_matches = self.match_positions
+        matches = old_matches[:bisect.bisect_right(old_matches, position - length)]
+        match_end = matches[-1] + length if matches else 0
+        for pos in found:
+            if pos >= match_end:
+                matches.append(pos)
+                match_end = pos + length
+        old_index = bisect.bisect_left(old_matches, edit_end)
+        index = bisect.bisect_left(candidates, match_end - shift, tail)
+        while index < len(candidates):
+            pos = candidates[index]
+            matches.append(pos + shift)
+            old_index = bisect.bisect_left(old_matches, pos, old_index)
+            if old_index < len(old_matches) and old_matches[old_index] == pos:
+                matches.extend(pos + shift for pos in old_matches[old_index + 1:])
+                break
+            index = bisect.bisect_left(candidates, pos + length, index)
+        
+        self.candidate_positions = candidates[:keep] + found
+        self.candidate_positions.extend(pos + shift for pos in candidates[tail:])
+        self.match_positions = matches
+        self.total_matches = len(matches)
+        self.content_revision = document.revision()
+        
+        # Update label
+        if self.total_matches > 0:
+            self.current_match_index = min(max(self.current_match_index, 1), self.total_matches)
+            self.find_label.setText(f"{self.current_match_index}/{self.total_matches}")
+        else:
+            self.current_match_index = 0
+            self.find_label.setText("Find: (0)")
+    
     def showEvent(self, event):
         """Handle show event - set focus when shown"""
         super().showEvent(event)
         # Set focus to input field when shown - use QTimer to ensure it works
-        from PyQt5.QtCore import QTimer
         QTimer.singleShot(0, lambda: (
             self.find_edit.setFocus(),
             self.find_edit.setCursorPosition(0)
@@ -844,10 +1163,25 @@ class FindBar(QFrame):
                 # Reset to first match when search text changes
                 self.current_match_index = 0
             
-            # Ensure matches are counted
-            if not self.match_positions and search_text:
+            # Ensure matches are counted for the current search text and
+            # document (now, if a delayed count is pending); otherwise reuse
+            # the positions from the last count
+            document = self.parent_editor.text_edit.document()
+            revision = document.revision()
+            if (self.search_timer.isActive() or search_text != self.search_text
+                    or revision != self.content_revision):
+                self.search_timer.stop()
                 self.search_text = search_text
-                self.count_matches()
+                if document.characterCount() < BACKGROUND_SEARCH_SIZE:
+                    self.count_matches(background=False)
+                elif (self.count_worker is None or self.count_text != search_text
+                        or self.count_revision != revision):
+                    self.count_matches()
+                if self.count_worker is not None:
+                    # Large document being counted on the worker thread:
+                    # jump with Qt's own search meanwhile
+                    self.find_in_document(search_text)
+                    return
             
             if self.total_matches == 0:
                 self.find_label.setText("Find: (0)")
@@ -869,14 +1203,10 @@ class FindBar(QFrame):
                 current_pos = cursor.position()
             
             # Find next match position - always move to next
-            next_index = None
-            for i, pos in enumerate(self.match_positions):
-                if pos > current_pos:
-                    next_index = i
-                    break
+            next_index = bisect.bisect_right(self.match_positions, current_pos)
             
             # If no match found after current position, wrap to first
-            if next_index is None:
+            if next_index == len(self.match_positions):
                 next_index = 0
                 self.current_match_index = 1
             else:
@@ -896,26 +1226,45 @@ class FindBar(QFrame):
         except Exception as e:
             self.parent_editor.status_bar.showMessage(f"Search error: {str(e)}")
             self.find_label.setText("Find:")
+    
+    def find_in_document(self, search_text):
+        """Select the next occurrence using QTextDocument.find (no match count needed)"""
+        text_edit = self.parent_editor.text_edit
+        document = text_edit.document()
+        cursor = document.find(search_text, text_edit.textCursor())
+        if cursor.isNull():
+            # Wrap to the start of the document
+            cursor = document.find(search_text, QTextCursor(document))
+        if cursor.isNull():
+            self.parent_editor.status_bar.showMessage("Text not found")
+            return
+        text_edit.setTextCursor(cursor)
+        text_edit.ensureCursorVisible()
+        self.parent_editor.status_bar.showMessage(f"Found \"{search_text}\"")
 
 
 class HelpDialog(QDialog):
     """Help Documentation Dialog"""
     
+    # Built stylesheets by (theme, DPI scale), shared by all dialogs
+    style_cache = {}
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent_editor = parent
         self.setWindowTitle("About - SmartPad")
         
         # Set window icon
-        icon_path = Path(__file__).parent / "logo.png"
-        if icon_path.exists():
-            self.setWindowIcon(QIcon(str(icon_path)))
+        icon = window_icon()
+        if icon is not None:
+            self.setWindowIcon(icon)
         
-        # Calculate DPI-aware sizes
+        # Calculate DPI-aware sizes (queried once, reused by get_scaled_size)
         try:
             dpi_ratio = self.devicePixelRatioF() if hasattr(self, 'devicePixelRatioF') else 1.0
         except:
             dpi_ratio = 1.0
+        self.dpi_scale = max(1.0, dpi_ratio)
         
         # Scale minimum size with DPI - optimized for no scrolling
         base_width = 450
@@ -934,16 +1283,11 @@ class HelpDialog(QDialog):
         self.apply_theme()
         
         # Update title bar theme to dark
-        from .themes import ThemeManager
         ThemeManager.update_title_bar_theme(self, 'dark')
     
     def get_scaled_size(self, base_size):
         """Get DPI-scaled size"""
-        try:
-            dpi_ratio = self.devicePixelRatioF() if hasattr(self, 'devicePixelRatioF') else 1.0
-        except:
-            dpi_ratio = 1.0
-        return int(base_size * max(1.0, dpi_ratio))
+        return int(base_size * self.dpi_scale)
     
     def init_ui(self):
         """Initialize help dialog UI"""
@@ -1056,147 +1400,152 @@ A smart text editor inspired by Notepad
         """Apply theme to help dialog - matches main window theme with DPI scaling"""
         if hasattr(self.parent_editor, 'current_theme'):
             theme = self.parent_editor.current_theme
-            padding = self.get_scaled_size(10)
-            border_radius = self.get_scaled_size(4)
-            
-            if theme == 'dark':
-                self.setStyleSheet(f"""
-                    QDialog {{
-                        background-color: #1e1e1e;
-                        color: #d4d4d4;
-                    }}
-                    QLabel {{
-                        color: #d4d4d4;
-                    }}
-                    QTextEdit {{
-                        background-color: #252526;
-                        color: #d4d4d4;
-                        border: 1px solid #3e3e42;
-                        border-radius: {border_radius}px;
-                        padding: {padding}px;
-                        font-size: 8pt;
-                    }}
-                    QTextBrowser {{
-                        background-color: #252526;
-                        color: #d4d4d4;
-                        border: 1px solid #3e3e42;
-                        border-radius: {border_radius}px;
-                        padding: {padding}px;
-                        font-size: 8pt;
-                    }}
-                    QTextBrowser a {{
-                        color: #4fc3f7;
-                        text-decoration: none;
-                    }}
-                    QTextBrowser a:hover {{
-                        color: #81d4fa;
-                        text-decoration: underline;
-                    }}
-                    QScrollArea {{
-                        border: 1px solid #3e3e42;
-                        border-radius: {border_radius}px;
-                        background-color: #1e1e1e;
-                    }}
-                    QScrollBar:vertical {{
-                        background-color: #252526;
-                        width: {self.get_scaled_size(10)}px;
-                        border: none;
-                    }}
-                    QScrollBar::handle:vertical {{
-                        background-color: #424242;
-                        border-radius: {self.get_scaled_size(5)}px;
-                        min-height: {self.get_scaled_size(25)}px;
-                    }}
-                    QScrollBar::handle:vertical:hover {{
-                        background-color: #4e4e4e;
-                    }}
-                    QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
-                        height: 0px;
-                    }}
-                    QPushButton {{
-                        background-color: #0e639c;
-                        color: #ffffff;
-                        padding: {self.get_scaled_size(6)}px {self.get_scaled_size(20)}px;
-                        border: none;
-                        border-radius: {border_radius}px;
-                        font-weight: bold;
-                        font-size: 7pt;
-                    }}
-                    QPushButton:hover {{
-                        background-color: #1177bb;
-                    }}
-                    QPushButton:pressed {{
-                        background-color: #0a4d75;
-                    }}
-                """)
-            else:
-                self.setStyleSheet(f"""
-                    QDialog {{
-                        background-color: #ffffff;
-                        color: #333333;
-                    }}
-                    QLabel {{
-                        color: #333333;
-                    }}
-                    QTextEdit {{
-                        background-color: #f8f8f8;
-                        color: #333333;
-                        border: 1px solid #d0d0d0;
-                        border-radius: {border_radius}px;
-                        padding: {padding}px;
-                        font-size: 8pt;
-                    }}
-                    QTextBrowser {{
-                        background-color: #f8f8f8;
-                        color: #333333;
-                        border: 1px solid #d0d0d0;
-                        border-radius: {border_radius}px;
-                        padding: {padding}px;
-                        font-size: 8pt;
-                    }}
-                    QTextBrowser a {{
-                        color: #0078d4;
-                        text-decoration: none;
-                    }}
-                    QTextBrowser a:hover {{
-                        color: #005a9e;
-                        text-decoration: underline;
-                    }}
-                    QScrollArea {{
-                        border: 1px solid #d0d0d0;
-                        border-radius: {border_radius}px;
-                        background-color: #ffffff;
-                    }}
-                    QScrollBar:vertical {{
-                        background-color: #f0f0f0;
-                        width: {self.get_scaled_size(10)}px;
-                        border: none;
-                    }}
-                    QScrollBar::handle:vertical {{
-                        background-color: #c0c0c0;
-                        border-radius: {self.get_scaled_size(5)}px;
-                        min-height: {self.get_scaled_size(25)}px;
-                    }}
-                    QScrollBar::handle:vertical:hover {{
-                        background-color: #a0a0a0;
-                    }}
-                    QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
-                        height: 0px;
-                    }}
-                    QPushButton {{
-                        background-color: #0078d4;
-                        color: #ffffff;
-                        padding: {self.get_scaled_size(6)}px {self.get_scaled_size(20)}px;
-                        border: none;
-                        border-radius: {border_radius}px;
-                        font-weight: bold;
-                        font-size: 7pt;
-                    }}
-                    QPushButton:hover {{
-                        background-color: #005a9e;
-                    }}
-                    QPushButton:pressed {{
-                        background-color: #004578;
-                    }}
-                """)
+            key = (theme, self.dpi_scale)
+            style = HelpDialog.style_cache.get(key)
+            if style is None:
+                padding = self.get_scaled_size(10)
+                border_radius = self.get_scaled_size(4)
+                
+                if theme == 'dark':
+                    style = f"""
+                        QDialog {{
+                            background-color: #1e1e1e;
+                            color: #d4d4d4;
+                        }}
+                        QLabel {{
+                            color: #d4d4d4;
+                        }}
+                        QTextEdit {{
+                            background-color: #252526;
+                            color: #d4d4d4;
+                            border: 1px solid #3e3e42;
+                            border-radius: {border_radius}px;
+                            padding: {padding}px;
+                            font-size: 8pt;
+                        }}
+                        QTextBrowser {{
+                            background-color: #252526;
+                            color: #d4d4d4;
+                            border: 1px solid #3e3e42;
+                            border-radius: {border_radius}px;
+                            padding: {padding}px;
+                            font-size: 8pt;
+                        }}
+                        QTextBrowser a {{
+                            color: #4fc3f7;
+                            text-decoration: none;
+                        }}
+                        QTextBrowser a:hover {{
+                            color: #81d4fa;
+                            text-decoration: underline;
+                        }}
+                        QScrollArea {{
+                            border: 1px solid #3e3e42;
+                            border-radius: {border_radius}px;
+                            background-color: #1e1e1e;
+                        }}
+                        QScrollBar:vertical {{
+                            background-color: #252526;
+                            width: {self.get_scaled_size(10)}px;
+                            border: none;
+                        }}
+                        QScrollBar::handle:vertical {{
+                            background-color: #424242;
+                            border-radius: {self.get_scaled_size(5)}px;
+                            min-height: {self.get_scaled_size(25)}px;
+                        }}
+                        QScrollBar::handle:vertical:hover {{
+                            background-color: #4e4e4e;
+                        }}
+                        QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
+                            height: 0px;
+                        }}
+                        QPushButton {{
+                            background-color: #0e639c;
+                            color: #ffffff;
+                            padding: {self.get_scaled_size(6)}px {self.get_scaled_size(20)}px;
+                            border: none;
+                            border-radius: {border_radius}px;
+                            font-weight: bold;
+                            font-size: 7pt;
+                        }}
+                        QPushButton:hover {{
+                            background-color: #1177bb;
+                        }}
+                        QPushButton:pressed {{
+                            background-color: #0a4d75;
+                        }}
+                    """
+                else:
+                    style = f"""
+                        QDialog {{
+                            background-color: #ffffff;
+                            color: #333333;
+                        }}
+                        QLabel {{
+                            color: #333333;
+                        }}
+                        QTextEdit {{
+                            background-color: #f8f8f8;
+                            color: #333333;
+                            border: 1px solid #d0d0d0;
+                            border-radius: {border_radius}px;
+                            padding: {padding}px;
+                            font-size: 8pt;
+                        }}
+                        QTextBrowser {{
+                            background-color: #f8f8f8;
+                            color: #333333;
+                            border: 1px solid #d0d0d0;
+                            border-radius: {border_radius}px;
+                            padding: {padding}px;
+                            font-size: 8pt;
+                        }}
+                        QTextBrowser a {{
+                            color: #0078d4;
+                            text-decoration: none;
+                        }}
+                        QTextBrowser a:hover {{
+                            color: #005a9e;
+                            text-decoration: underline;
+                        }}
+                        QScrollArea {{
+                            border: 1px solid #d0d0d0;
+                            border-radius: {border_radius}px;
+                            background-color: #ffffff;
+                        }}
+                        QScrollBar:vertical {{
+                            background-color: #f0f0f0;
+                            width: {self.get_scaled_size(10)}px;
+                            border: none;
+                        }}
+                        QScrollBar::handle:vertical {{
+                            background-color: #c0c0c0;
+                            border-radius: {self.get_scaled_size(5)}px;
+                            min-height: {self.get_scaled_size(25)}px;
+                        }}
+                        QScrollBar::handle:vertical:hover {{
+                            background-color: #a0a0a0;
+                        }}
+                        QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
+                            height: 0px;
+                        }}
+                        QPushButton {{
+                            background-color: #0078d4;
+                            color: #ffffff;
+                            padding: {self.get_scaled_size(6)}px {self.get_scaled_size(20)}px;
+                            border: none;
+                            border-radius: {border_radius}px;
+                            font-weight: bold;
+                            font-size: 7pt;
+                        }}
+                        QPushButton:hover {{
+                            background-color: #005a9e;
+                        }}
+                        QPushButton:pressed {{
+                            background-color: #004578;
+                        }}
+                    """
+                HelpDialog.style_cache[key] = style
+            self.setStyleSheet(style)
 
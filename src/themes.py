@@ -8,10 +8,37 @@ Provides theme management for the application
 import sys
 from PyQt5.QtGui import QColor, QPalette
 
+# DwmSetWindowAttribute with its prototype declared once (Windows 10/11 only)
+_dwm_set_window_attribute = None
+if sys.platform == 'win32':
+    try:
+        import ctypes
+        from ctypes import wintypes
+        _dwm_set_window_attribute = ctypes.windll.dwmapi.DwmSetWindowAttribute
+        _dwm_set_window_attribute.argtypes = [
+            wintypes.HWND, wintypes.DWORD, ctypes.c_void_p, wintypes.DWORD
+        ]
+        _dwm_set_window_attribute.restype = ctypes.c_long
+        # Attribute values passed by reference, one per theme
+        _DARK_MODE_VALUES = {'dark': ctypes.c_int(1), 'light': ctypes.c_int(0)}
+    except (OSError, AttributeError):
+        _dwm_set_window_attribute = None
+
+DWMWA_USE_IMMERSIVE_DARK_MODE = 20
+
+# Window/text colors of the palette for each theme
+THEME_PALETTE_COLORS = {
+    'dark': ("#1e1e1e", "#d4d4d4"),
+    'light': ("#ffffff", "#333333"),
+}
+
 
 class ThemeManager:
     """Manages application themes"""
     
+    # Palettes built by get_palette, keyed by theme
+    _palettes = {}
+    
     @staticmethod
     def get_dark_theme_style():
         """Get dark theme stylesheet"""
@@ -181,33 +208,35 @@ class ThemeManager:
         """Apply theme to widget"""
         if theme == 'dark':
             widget.setStyleSheet(ThemeManager.get_dark_theme_style())
-            palette = QPalette()
-            palette.setColor(QPalette.Window, QColor("#1e1e1e"))
-            palette.setColor(QPalette.WindowText, QColor("#d4d4d4"))
-            widget.setPalette(palette)
         else:
             widget.setStyleSheet(ThemeManager.get_light_theme_style())
+            theme = 'light'
+        widget.setPalette(ThemeManager.get_palette(theme))
+    
+    @staticmethod
+    def get_palette(theme):
+        """Get the palette for a theme (built on first use, once a QApplication exists)"""
+        palette = ThemeManager._palettes.get(theme)
+        if palette is None:
+            window, window_text = THEME_PALETTE_COLORS[theme]
             palette = QPalette()
-            palette.setColor(QPalette.Window, QColor("#ffffff"))
-            palette.setColor(QPalette.WindowText, QColor("#333333"))
-            widget.setPalette(palette)
+            palette.setColor(QPalette.Window, QColor(window))
+            palette.setColor(QPalette.WindowText, QColor(window_text))
+            ThemeManager._palettes[theme] = palette
+        return palette
     
     @staticmethod
     def update_title_bar_theme(window, theme):
         """Update title bar theme using Windows API"""
         try:
-            if sys.platform == 'win32':
-                import ctypes
-                from ctypes import wintypes
+            if _dwm_set_window_attribute is not None:
                 # Enable/disable dark mode for title bar (Windows 10/11)
-                DWMWA_USE_IMMERSIVE_DARK_MODE = 20
-                hwnd = int(window.winId())
-                dark_mode = 1 if theme == 'dark' else 0
-                ctypes.windll.dwmapi.DwmSetWindowAttribute(
-                    wintypes.HWND(hwnd),
+                value = _DARK_MODE_VALUES['dark' if theme == 'dark' else 'light']
+                _dwm_set_window_attribute(
+                    int(window.winId()),
                     DWMWA_USE_IMMERSIVE_DARK_MODE,
-                    ctypes.byref(ctypes.c_int(dark_mode)),
-                    ctypes.sizeof(ctypes.c_int)
+                    ctypes.byref(value),
+                    ctypes.sizeof(value)
                 )
         except Exception:
             pass  # Ignore if not Windows or API not available
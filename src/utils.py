@@ -7,7 +7,36 @@ Provides utility functions for the application
 
 import json
 import re
-from pathlib import Path
+import os
+import importlib
+
+# Optional accelerator/formatter backends, imported on first use (see
+# optional_import). The standalone build cannot see these string imports,
+# so build_exe.py includes the installed ones explicitly
+_optional_modules = {}
+
+
+def optional_import(name):
+    """Import an optional module on first use; returns None if it is missing"""
+    if name not in _optional_modules:
+        try:
+            _optional_modules[name] = importlib.import_module(name)
+        except ImportError:
+            _optional_modules[name] = None
+    return _optional_modules[name]
+
+
+# Language for each file extension (see detect_language)
+_LANGUAGE_MAP = {
+    '.xml': 'xml',
+    '.html': 'html',
+    '.htm': 'html',
+    '.json': 'json',
+    '.py': 'python',
+    '.css': 'css',
+    '.js': 'javascript',
+    '.jsx': 'javascript',
+}
 
 
 def detect_language(filename):
@@ -15,57 +44,73 @@ def detect_language(filename):
     if not filename:
         return 'generic'
     
-    ext = Path(filename).suffix.lower()
-    language_map = {
-        '.xml': 'xml',
-        '.html': 'html',
-        '.htm': 'html',
-        '.json': 'json',
-        '.py': 'python',
-        '.css': 'css',
-        '.js': 'javascript',
-        '.jsx': 'javascript',
-    }
-    return language_map.get(ext, 'generic')
+    ext = os.path.splitext(filename)[1].lower()
+    return _LANGUAGE_MAP.get(ext, 'generic')
+
+
+# Content signatures for detect_file_type_from_content, compiled once
+_NONSPACE = re.compile(r'\S')
+_XML_TAG = re.compile(r'<[^>]+>')
+_XML_CLOSING = re.compile(r'</\w+>|<\w+[^>]*/>')
+_JSON_KEY = re.compile(r'"[^"]+"\s*:')
+_JSON_STRING_VALUE = re.compile(r':\s*"[^"]+"')
 
 
 def detect_file_type_from_content(content):
     """Detect file type from content - more robust detection"""
-    if not content or not content.strip():
+    first = _NONSPACE.search(content) if content else None
+    if first is None:
         return None
-    
-    content_stripped = content.strip()
+    start = first.start()
     
     # Check for XML - more comprehensive
     # Look for XML declaration or XML-like tags
-    if content_stripped.startswith('<?xml'):
+    if content.startswith('<?xml', start):
         return 'xml'
     
-    # Check for XML-like structure (tags with < >)
-    if re.search(r'<[^>]+>', content):
-        # Count XML-like patterns
-        tag_count = len(re.findall(r'<[^>]+>', content))
-        # If there are multiple tags, likely XML
-        if tag_count >= 2:
-            # Check for common XML patterns
-            if re.search(r'</\w+>', content) or re.search(r'<\w+[^>]*/>', content):
-                return 'xml'
-            # Check for XML-like structure even without closing tags
-            if tag_count >= 3:
-                return 'xml'
+    # Check for XML-like structure (tags with < >); stop counting at 3
+    tag_count = 0
+    for _ in _XML_TAG.finditer(content, start):
+        tag_count += 1
+        if tag_count == 3:
+            # Enough tags for XML-like structure even without closing tags
+            return 'xml'
+    # With two tags, require a closing or self-closing tag
+    if tag_count == 2 and _XML_CLOSING.search(content, start):
+        return 'xml'
     
     # Check for JSON - more robust
-    if content_stripped.startswith('{') or content_stripped.startswith('['):
-        try:
-            json.loads(content)
-            return 'json'
-        except:
-            # Try to detect JSON-like structure even if invalid
-            if (content_stripped.startswith('{') and '}' in content) or \
-               (content_stripped.startswith('[') and ']' in content):
-                # Check for JSON-like patterns
-                if re.search(r'"[^"]+"\s*:', content) and re.search(r':\s*"[^"]+"', content):
-                    return 'json'
+    opener = content[start]
+    if opener == '{' or opener == '[':
+        closer = '}' if opener == '{' else ']'
+        # Only content ending with the matching bracket can parse (a truncated
+        # sample of a large file can't, so skip the parse attempt for it)
+        if content.rstrip().endswith(closer):
+            try:
+                # orjson rejects some documents json accepts (NaN, huge ints),
+                # so it only serves as the fast path
+                if not _orjson_parses(content):
+                    json.loads(content)
+                return 'json'
+            except:
+                pass
+        # Try to detect JSON-like structure even if invalid (both patterns
+        # need a colon, which a plain substring test finds at memchr speed)
+        if closer in content and ':' in content:
+            # Check for JSON-like patterns
+            if _JSON_KEY.search(content) and _JSON_STRING_VALUE.search(content):
+                return 'json'
     
     return None
 
+
+def _orjson_parses(content):
+    """Check whether orjson is installed and can parse content"""
+    orjson = optional_import('orjson')
+    if orjson is None:
+        return False
+    try:
+        orjson.loads(content)
+        return True
+    except orjson.JSONDecodeError:
+        return False